@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+import hashlib
+import re
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime
 
+from ..core.cache import cache, cache_key_for_analysis
+from ..core.config import settings
 from ..core.database import get_db
 from ..models.schemas import (
-    CurrencyPairRequest, ForexRecommendationResponse, 
+    CurrencyPairRequest, ForexRecommendationResponse, REC_ADAPTER,
     HealthResponse, TechnicalAnalysis, SentimentAnalysis, EventAnalysis
 )
 from ..models.models import ForexRecommendation, ForexRate, NewsArticle
-from ..services.forex_api import ForexAPIService
+from ..services.forex_api import ForexAPIService, ForexUpstreamError
 from ..services.news_sentiment import NewsSentimentService
 from ..services.strategy_engine import StrategyEngine
 
@@ -21,6 +29,43 @@ news_service = NewsSentimentService()
 strategy_engine = StrategyEngine()
 
 
+def _etag(body: bytes) -> str:
+    """Compute a strong ETag for a response body"""
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def _conditional_response(request: Request, body: bytes, etag: str, cache_control: str) -> Response:
+    """Return a JSON body with caching headers, or 304 if If-None-Match matches"""
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _cacheable_response(request: Request, content, cache_control: str) -> Response:
+    """Build a JSON response with Cache-Control and an ETag honoring If-None-Match"""
+    body = ORJSONResponse(content=jsonable_encoder(content)).body
+    return _conditional_response(request, body, _etag(body), cache_control)
+
+
+# The supported pairs list is static, so its response is serialized once at import
+SUPPORTED_PAIRS = [
+    "EUR/USD", "GBP/USD", "USD/JPY", "USD/CHF",
+    "AUD/USD", "USD/CAD", "NZD/USD", "EUR/GBP",
+    "EUR/JPY", "GBP/JPY", "CHF/JPY", "EUR/CHF",
+    "AUD/JPY", "GBP/CHF", "AUD/NZD"
+]
+_SUPPORTED_PAIRS_BODY = ORJSONResponse(
+    content={"supported_pairs": SUPPORTED_PAIRS, "count": len(SUPPORTED_PAIRS)}
+).body
+_SUPPORTED_PAIRS_ETAG = _etag(_SUPPORTED_PAIRS_BODY)
+_SUPPORTED_PAIRS_SET = frozenset(SUPPORTED_PAIRS)
+
+_PAIR_RE = re.compile(r"[A-Z]{3}/[A-Z]{3}")
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
@@ -31,31 +76,51 @@ async def health_check():
     )
 
 
-@router.post("/analyze", response_model=ForexRecommendationResponse)
+# The response is serialized by REC_ADAPTER, so FastAPI's response_model pass is
+# skipped; the model is still declared for the OpenAPI schema
+@router.post("/analyze", response_model=None, responses={200: {"model": ForexRecommendationResponse}})
 async def analyze_currency_pair(
     request: CurrencyPairRequest,
-    db: Session = Depends(get_db)
+    fresh: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Analyze a currency pair and provide trading recommendation"""
+    """Analyze a currency pair and provide trading recommendation.
+    
+    Results are cached per currency pair for ``CACHE_TTL`` seconds; pass
+    ``?fresh=true`` to bypass that cache and the cached rates, daily series
+    and News API results behind it.
+    """
     try:
         currency_pair = request.currency_pair.upper()
         
-        # Validate currency pair format
-        if '/' not in currency_pair:
+        # Validate currency pair format (supported pairs skip the regex)
+        if currency_pair not in _SUPPORTED_PAIRS_SET and not _PAIR_RE.fullmatch(currency_pair):
             raise HTTPException(status_code=400, detail="Currency pair must be in format 'USD/EUR'")
         
-        currencies = currency_pair.split('/')
-        if len(currencies) != 2 or len(currencies[0]) != 3 or len(currencies[1]) != 3:
-            raise HTTPException(status_code=400, detail="Invalid currency pair format")
+        # Serve a recent analysis from cache when available
+        cache_key = cache_key_for_analysis(currency_pair)
+        if not fresh:
+            cached = await cache.get(cache_key)
+            if cached:
+                # Cached entries were stored in JSON mode, so no re-validation is needed
+                return ORJSONResponse(content=cached)
         
-        # Get technical analysis
-        technical_data = await forex_service.get_technical_analysis(currency_pair)
+        # Fetch technical analysis and news concurrently; a failure in one
+        # does not cancel the other
+        technical_data, news_articles = await asyncio.gather(
+            forex_service.get_technical_analysis(currency_pair, force_refresh=fresh),
+            news_service.fetch_news_articles(currency_pair, force_refresh=fresh),
+            return_exceptions=True
+        )
+        if isinstance(technical_data, Exception):
+            raise technical_data
         if technical_data['current_rate'] == 0:
             raise HTTPException(status_code=503, detail="Unable to fetch forex data. Please check API configuration.")
         
-        # Get news and sentiment analysis
-        news_articles = await news_service.fetch_news_articles(currency_pair)
-        sentiment_data = news_service.analyze_sentiment(news_articles)
+        # News is best-effort: analyze without articles if the fetch failed
+        if isinstance(news_articles, Exception):
+            news_articles = []
+        sentiment_data = await news_service.analyze_sentiment(news_articles)
         
         # Generate recommendation using strategy engine
         recommendation_data = strategy_engine.generate_recommendation(
@@ -77,16 +142,19 @@ async def analyze_currency_pair(
             news_count=sentiment_data.get('news_count', 0)
         )
         
+        economic_events = '; '.join(sentiment_data.get('economic_events') or ())
+        geopolitical_events = '; '.join(sentiment_data.get('geopolitical_events') or ())
+        
         event_analysis = EventAnalysis(
-            economic_events='; '.join(sentiment_data.get('economic_events', [])),
-            geopolitical_events='; '.join(sentiment_data.get('geopolitical_events', [])),
+            economic_events=economic_events,
+            geopolitical_events=geopolitical_events,
             impact_score=recommendation_data.get('event_score', 0.0)
         )
         
         # Save to database
         db_recommendation = ForexRecommendation(
             currency_pair=currency_pair,
-            recommendation=recommendation_data['recommendation'],
+            recommendation=recommendation_data['recommendation'].value,
             confidence_score=recommendation_data['confidence_score'],
             current_rate=technical_data['current_rate'],
             technical_summary=technical_data.get('summary', ''),
@@ -97,33 +165,33 @@ async def analyze_currency_pair(
             sentiment_score=sentiment_data.get('score', 0.0),
             sentiment_summary=sentiment_data.get('summary', ''),
             news_count=sentiment_data.get('news_count', 0),
-            economic_events='; '.join(sentiment_data.get('economic_events', [])),
-            geopolitical_events='; '.join(sentiment_data.get('geopolitical_events', [])),
+            economic_events=economic_events,
+            geopolitical_events=geopolitical_events,
             event_impact_score=recommendation_data.get('event_score', 0.0),
             justification=recommendation_data['justification']
         )
         
-        db.add(db_recommendation)
-        db.commit()
-        db.refresh(db_recommendation)
-        
-        # Save news articles
-        for article in news_articles[:10]:  # Save top 10 articles
-            db_article = NewsArticle(
-                title=article.get('title', ''),
-                content=article.get('content', ''),
-                source=article.get('source', ''),
-                url=article.get('url', ''),
-                published_at=article.get('published_at'),
-                sentiment_score=sentiment_data.get('score', 0.0),
-                currency_pairs_mentioned=currency_pair
-            )
-            db.add(db_article)
+        # Top 10 news articles, saved in a single executemany INSERT
+        article_rows = [
+            {
+                'title': article.get('title', ''),
+                'content': article.get('content', ''),
+                'source': article.get('source', ''),
+                'url': article.get('url', ''),
+                'published_at': article.get('published_at'),
+                'sentiment_score': sentiment_data.get('score', 0.0),
+                'currency_pairs_mentioned': [currency_pair]
+            }
+            for article in news_articles[:10]
+        ]
         
-        db.commit()
+        # One transaction (and one commit) for the recommendation and articles
+        async with db.begin():
+            db.add(db_recommendation)
+            if article_rows:
+                await db.execute(insert(NewsArticle), article_rows)
         
-        # Return response
-        return ForexRecommendationResponse(
+        response = ForexRecommendationResponse(
             currency_pair=currency_pair,
             recommendation=recommendation_data['recommendation'],
             confidence_score=recommendation_data['confidence_score'],
@@ -134,8 +202,11 @@ async def analyze_currency_pair(
             justification=recommendation_data['justification'],
             timestamp=datetime.now()
         )
+        await cache.set(cache_key, response.model_dump(mode='json'), ttl=settings.CACHE_TTL)
+        
+        return Response(content=REC_ADAPTER.dump_json(response), media_type="application/json")
         
-    except HTTPException:
+    except (HTTPException, ForexUpstreamError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -143,57 +214,90 @@ async def analyze_currency_pair(
 
 @router.get("/history/{currency_pair}")
 async def get_recommendation_history(
+    request: Request,
     currency_pair: str,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    before_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get historical recommendations for a currency pair"""
-    recommendations = db.query(ForexRecommendation)\
-        .filter(ForexRecommendation.currency_pair == currency_pair.upper())\
-        .order_by(ForexRecommendation.created_at.desc())\
-        .limit(limit)\
-        .all()
+    """Get historical recommendations for a currency pair.
     
-    return recommendations
+    Pages are keyset-paginated on ``(created_at, id)``: pass the ``id`` of
+    the last row as ``before_id`` to fetch the next (older) page.
+    """
+    # Read-only rows: select plain column mappings instead of ORM instances
+    recommendations_table = ForexRecommendation.__table__
+    stmt = select(recommendations_table)\
+        .where(recommendations_table.c.currency_pair == currency_pair.upper())
+    if before_id is not None:
+        # Compare with the cursor row's stored created_at rather than a bound datetime
+        # (SQLite's func.now() text has no microseconds, so the two don't sort alike);
+        # id orders rows created in the same second
+        cursor_created_at = select(recommendations_table.c.created_at)\
+            .where(recommendations_table.c.id == before_id)\
+            .scalar_subquery()
+        stmt = stmt.where(or_(
+            recommendations_table.c.created_at < cursor_created_at,
+            and_(
+                recommendations_table.c.created_at == cursor_created_at,
+                recommendations_table.c.id < before_id
+            )
+        ))
+    
+    stmt = stmt\
+        .order_by(recommendations_table.c.created_at.desc(), recommendations_table.c.id.desc())\
+        .limit(limit)
+    result = await db.execute(stmt)
+    recommendations = [dict(row) for row in result.mappings()]
+    for recommendation in recommendations:
+        # Rows written by the old Enum column hold the member name ('BUY'), not the value
+        recommendation['recommendation'] = recommendation['recommendation'].lower()
+    
+    return _cacheable_response(request, recommendations, "public, max-age=60")
 
 
 @router.get("/rates/{currency_pair}")
-async def get_current_rate(currency_pair: str):
+async def get_current_rate(request: Request, currency_pair: str):
     """Get current exchange rate for a currency pair"""
     try:
         from_currency, to_currency = currency_pair.upper().split('/')
+        # Rates are cached by the service for a short TTL
         rate_data = await forex_service.get_exchange_rate(from_currency, to_currency)
         
         if not rate_data:
             raise HTTPException(status_code=503, detail="Unable to fetch exchange rate")
         
-        return rate_data
+        return _cacheable_response(request, rate_data, "public, max-age=60")
         
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid currency pair format")
+    except ForexUpstreamError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching rate: {str(e)}")
 
 
 @router.get("/news/{currency_pair}")
-async def get_currency_news(currency_pair: str, days: int = 7):
+async def get_currency_news(request: Request, currency_pair: str, days: int = 7):
     """Get recent news articles for a currency pair"""
     try:
         articles = await news_service.fetch_news_articles(currency_pair.upper(), days)
-        return {"articles": articles, "count": len(articles)}
+        # text_lower is an internal matching buffer, not part of the API
+        articles = [
+            {key: value for key, value in article.items() if key != 'text_lower'}
+            for article in articles
+        ]
+        return _cacheable_response(
+            request, {"articles": articles, "count": len(articles)}, "public, max-age=300"
+        )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching news: {str(e)}")
 
 
 @router.get("/supported-pairs")
-async def get_supported_pairs():
+async def get_supported_pairs(request: Request):
     """Get list of supported currency pairs"""
-    major_pairs = [
-        "EUR/USD", "GBP/USD", "USD/JPY", "USD/CHF",
-        "AUD/USD", "USD/CAD", "NZD/USD", "EUR/GBP",
-        "EUR/JPY", "GBP/JPY", "CHF/JPY", "EUR/CHF",
-        "AUD/JPY", "GBP/CHF", "AUD/NZD"
-    ]
-    
-    return {"supported_pairs": major_pairs, "count": len(major_pairs)}
\ No newline at end of file
+    return _conditional_response(
+        request, _SUPPORTED_PAIRS_BODY, _SUPPORTED_PAIRS_ETAG, "public, max-age=86400, immutable"
+    )
\ No newline at end of file
@@ -1,18 +1,43 @@
 import json
 import hashlib
-from typing import Optional, Any, Dict
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Dict, List, Tuple
 import redis.asyncio as redis
 from .config import settings
 from .logging import get_logger
 
+try:
+    import orjson
+except ImportError:  # orjson is only pinned in requirements-prod.txt
+    orjson = None
+
 logger = get_logger("cache")
 
+def _dumps(value: Any) -> str:
+    """Serialize a cache value, preferring orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(
+            value,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    return json.dumps(value, default=str)
+
+def _loads(value: str) -> Any:
+    """Deserialize a cache value, preferring orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
 class CacheManager:
     """Redis-based caching with fallback to memory"""
     
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
-        self.memory_cache: Dict[str, Any] = {}
+        # LRU of key -> (expires_at, value) used when Redis is unavailable
+        self.memory_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.memory_cache_size = 100
         self.is_connected = False
     
     async def connect(self):
@@ -44,10 +69,13 @@ class CacheManager:
             self.is_connected = False
     
     def _generate_key(self, prefix: str, **kwargs) -> str:
-        """Generate cache key from parameters"""
-        key_data = json.dumps(kwargs, sort_keys=True)
-        key_hash = hashlib.md5(key_data.encode()).hexdigest()
-        return f"{prefix}:{key_hash}"
+        """Generate a readable cache key from parameters"""
+        key = prefix + ":" + ":".join(f"{k}={kwargs[k]}" for k in sorted(kwargs))
+        # Hash only unusually long keys to keep Redis keys bounded
+        if len(key) > 200:
+            key_hash = hashlib.md5(key.encode()).hexdigest()
+            return f"{prefix}:{key_hash}"
+        return key
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
@@ -55,31 +83,48 @@ class CacheManager:
             if self.is_connected and self.redis_client:
                 value = await self.redis_client.get(key)
                 if value:
-                    return json.loads(value)
+                    return _loads(value)
             else:
                 # Fallback to memory cache
-                return self.memory_cache.get(key)
+                entry = self.memory_cache.get(key)
+                if entry:
+                    expires_at, value = entry
+                    if expires_at > time.monotonic():
+                        self.memory_cache.move_to_end(key)
+                        return value
+                    del self.memory_cache[key]
         except Exception as e:
             logger.error("Cache get failed", key=key, error=str(e))
         return None
     
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get multiple values from cache in one round trip"""
+        if not keys:
+            return []
+        try:
+            if self.is_connected and self.redis_client:
+                values = await self.redis_client.mget(keys)
+                return [_loads(value) if value else None for value in values]
+            return [await self.get(key) for key in keys]
+        except Exception as e:
+            logger.error("Cache mget failed", count=len(keys), error=str(e))
+        return [None] * len(keys)
+    
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache"""
         try:
             ttl = ttl or settings.CACHE_TTL
-            serialized_value = json.dumps(value, default=str)
+            serialized_value = _dumps(value)
             
             if self.is_connected and self.redis_client:
                 await self.redis_client.setex(key, ttl, serialized_value)
             else:
-                # Fallback to memory cache (simple, no TTL)
-                self.memory_cache[key] = value
-                # Keep memory cache size limited
-                if len(self.memory_cache) > 100:
-                    # Remove oldest items
-                    keys_to_remove = list(self.memory_cache.keys())[:20]
-                    for k in keys_to_remove:
-                        del self.memory_cache[k]
+                # Fallback to memory cache (LRU with TTL)
+                self.memory_cache[key] = (time.monotonic() + ttl, value)
+                self.memory_cache.move_to_end(key)
+                # Keep memory cache size limited by evicting least recently used
+                while len(self.memory_cache) > self.memory_cache_size:
+                    self.memory_cache.popitem(last=False)
             
             return True
         except Exception as e:
@@ -98,14 +143,27 @@ class CacheManager:
             logger.error("Cache delete failed", key=key, error=str(e))
             return False
     
+    async def _delete_batch(self, keys: List[str]) -> int:
+        """Delete a batch of Redis keys through a pipeline"""
+        pipe = self.redis_client.pipeline()
+        pipe.delete(*keys)
+        results = await pipe.execute()
+        return sum(results)
+    
     async def clear_prefix(self, prefix: str) -> int:
         """Clear all keys with given prefix"""
         count = 0
         try:
             if self.is_connected and self.redis_client:
-                keys = await self.redis_client.keys(f"{prefix}:*")
-                if keys:
-                    count = await self.redis_client.delete(*keys)
+                # SCAN instead of KEYS so large keyspaces don't block Redis
+                batch = []
+                async for key in self.redis_client.scan_iter(match=f"{prefix}:*", count=500):
+                    batch.append(key)
+                    if len(batch) >= 500:
+                        count += await self._delete_batch(batch)
+                        batch = []
+                if batch:
+                    count += await self._delete_batch(batch)
             else:
                 # Memory cache
                 keys_to_remove = [k for k in self.memory_cache.keys() if k.startswith(f"{prefix}:")]
@@ -125,18 +183,28 @@ cache = CacheManager()
 class CacheKeys:
     """Cache key constants"""
     FOREX_RATE = "forex_rate"
+    FOREX_DAILY = "forex_daily"
     FOREX_ANALYSIS = "forex_analysis"
     NEWS_ARTICLES = "news_articles"
+    NEWS_API = "news_api"
     SUPPORTED_PAIRS = "supported_pairs"
 
 def cache_key_for_forex_rate(from_currency: str, to_currency: str) -> str:
     """Generate cache key for forex rate"""
     return cache._generate_key(CacheKeys.FOREX_RATE, from_currency=from_currency, to_currency=to_currency)
 
+def cache_key_for_forex_daily(from_currency: str, to_currency: str, outputsize: str = "compact") -> str:
+    """Generate cache key for daily forex time series"""
+    return cache._generate_key(CacheKeys.FOREX_DAILY, from_currency=from_currency, to_currency=to_currency, outputsize=outputsize)
+
 def cache_key_for_analysis(currency_pair: str) -> str:
     """Generate cache key for forex analysis"""
     return cache._generate_key(CacheKeys.FOREX_ANALYSIS, currency_pair=currency_pair)
 
 def cache_key_for_news(currency_pair: str, days: int = 7) -> str:
     """Generate cache key for news articles"""
-    return cache._generate_key(CacheKeys.NEWS_ARTICLES, currency_pair=currency_pair, days=days)
\ No newline at end of file
+    return cache._generate_key(CacheKeys.NEWS_ARTICLES, currency_pair=currency_pair, days=days)
+
+def cache_key_for_news_api(currencies: List[str], days: int = 7) -> str:
+    """Generate cache key for News API results (currency order doesn't matter)"""
+    return cache._generate_key(CacheKeys.NEWS_API, currencies=','.join(sorted(currencies)), days=days)
\ No newline at end of file
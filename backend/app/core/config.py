@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from typing import Optional, List
 import os
+from functools import cached_property
 from dotenv import load_dotenv
 import json
 
@@ -60,18 +61,34 @@ class Settings(BaseSettings):
     
     # Monitoring
     SENTRY_DSN: Optional[str] = os.getenv("SENTRY_DSN")
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "False").lower() == "true"
     
     # API Timeouts
     API_TIMEOUT: int = int(os.getenv("API_TIMEOUT", "30"))
     
-    @property
+    # Outbound HTTP connection pool and news fetch concurrency
+    HTTP_POOL_LIMIT: int = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+    HTTP_POOL_LIMIT_PER_HOST: int = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10"))
+    HTTP_DNS_CACHE_TTL: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "600"))
+    NEWS_FETCH_CONCURRENCY: int = int(os.getenv("NEWS_FETCH_CONCURRENCY", "8"))
+    # Sentiment worker processes per app worker (0 scores in the default thread pool);
+    # every gunicorn worker starts its own pool, so keep this small
+    NEWS_SENTIMENT_WORKERS: int = int(os.getenv("NEWS_SENTIMENT_WORKERS", "1"))
+    
+    # ENVIRONMENT is fixed for the process lifetime, so compute these once
+    @cached_property
     def is_production(self) -> bool:
         return self.ENVIRONMENT == "production"
     
-    @property
+    @cached_property
     def is_development(self) -> bool:
         return self.ENVIRONMENT == "development"
     
+    @cached_property
+    def metrics_enabled(self) -> bool:
+        # /metrics exposes the whole registry, so production needs an explicit opt-in
+        return self.METRICS_ENABLED or not self.is_production
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
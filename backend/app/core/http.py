@@ -0,0 +1,44 @@
+import aiohttp
+from typing import Optional
+from .config import settings
+from .logging import get_logger
+
+logger = get_logger("http")
+
+class HTTPClientManager:
+    """Application-wide aiohttp session with a pooled, keep-alive connector"""
+    
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None
+    
+    async def connect(self):
+        """Create the shared session"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=settings.HTTP_POOL_LIMIT,
+                    limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                    keepalive_timeout=30,
+                    # Upstream hosts are a fixed handful, so resolve them rarely
+                    use_dns_cache=True,
+                    ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+                    enable_cleanup_closed=True
+                ),
+                timeout=aiohttp.ClientTimeout(total=settings.API_TIMEOUT)
+            )
+            logger.info("HTTP client session created")
+    
+    async def disconnect(self):
+        """Close the shared session"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it if the app lifespan hasn't"""
+        if self.session is None or self.session.closed:
+            await self.connect()
+        return self.session
+
+# Global HTTP client instance
+http_client = HTTPClientManager()
\ No newline at end of file
@@ -1,5 +1,7 @@
+import atexit
 import logging
 import logging.handlers
+import queue
 import sys
 from pathlib import Path
 from typing import Optional
@@ -7,6 +9,9 @@ import structlog
 from pythonjsonlogger import jsonlogger
 from .config import settings
 
+# Background thread that owns the real (blocking) handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
 def setup_logging() -> None:
     """Configure structured logging for production"""
     
@@ -56,7 +61,7 @@ def setup_logging() -> None:
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
     console_handler.setLevel(log_level)
-    root_logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # File handler for production
     if settings.LOG_FILE and settings.is_production:
@@ -70,7 +75,17 @@ def setup_logging() -> None:
         )
         file_handler.setFormatter(formatter)
         file_handler.setLevel(log_level)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # Log calls only enqueue records; a listener thread does the stream/file I/O
+    # so request handlers never block the event loop on a write
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+    log_queue: queue.Queue = queue.Queue(-1)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
     
     # Silence noisy loggers
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -79,6 +94,15 @@ def setup_logging() -> None:
     logger = structlog.get_logger("forex-strategist.startup")
     logger.info("Logging configured", level=settings.LOG_LEVEL, production=settings.is_production)
 
+def stop_logging() -> None:
+    """Flush queued log records and stop the listener thread"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+atexit.register(stop_logging)
+
 def get_logger(name: str):
     """Get a structured logger instance"""
     return structlog.get_logger(name)
\ No newline at end of file
@@ -1,11 +1,23 @@
 import sentry_sdk
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+import os
 import time
-from typing import Dict, List
-from datetime import datetime, timedelta
+import asyncio
+import aiohttp
+from sqlalchemy import text
+from typing import Dict, Optional
+from prometheus_client import CollectorRegistry, Counter as PrometheusCounter, Histogram, make_asgi_app, multiprocess
 from .config import settings
 from .logging import get_logger
+from .http import http_client
+
+try:
+    import psutil
+    # Seed cpu_percent so the first non-blocking reading measures a real interval
+    psutil.cpu_percent(interval=None)
+except ImportError:
+    psutil = None
 
 logger = get_logger("monitoring")
 
@@ -26,104 +38,22 @@ def setup_sentry():
     else:
         logger.warning("Sentry DSN not configured - error tracking disabled")
 
-class MetricsCollector:
-    """Simple metrics collector for monitoring application performance"""
-    
-    def __init__(self):
-        self.request_count = 0
-        self.request_duration_sum = 0.0
-        self.request_durations: List[float] = []
-        self.error_count = 0
-        self.api_call_count = 0
-        self.api_error_count = 0
-        self.last_reset = datetime.now()
-        self.recommendation_count = 0
-        self.currency_pairs_analyzed: Dict[str, int] = {}
-    
-    def record_request(self, duration: float, status_code: int):
-        """Record a request with its duration and status"""
-        self.request_count += 1
-        self.request_duration_sum += duration
-        self.request_durations.append(duration)
-        
-        # Keep only last 1000 requests for memory efficiency
-        if len(self.request_durations) > 1000:
-            self.request_durations = self.request_durations[-1000:]
-        
-        if status_code >= 400:
-            self.error_count += 1
-    
-    def record_api_call(self, success: bool = True):
-        """Record an external API call"""
-        self.api_call_count += 1
-        if not success:
-            self.api_error_count += 1
-    
-    def record_recommendation(self, currency_pair: str):
-        """Record a recommendation generated"""
-        self.recommendation_count += 1
-        if currency_pair in self.currency_pairs_analyzed:
-            self.currency_pairs_analyzed[currency_pair] += 1
-        else:
-            self.currency_pairs_analyzed[currency_pair] = 1
-    
-    def get_metrics(self) -> Dict:
-        """Get current metrics summary"""
-        now = datetime.now()
-        uptime = (now - self.last_reset).total_seconds()
-        
-        avg_duration = (
-            self.request_duration_sum / self.request_count 
-            if self.request_count > 0 else 0
-        )
-        
-        p95_duration = (
-            sorted(self.request_durations)[int(len(self.request_durations) * 0.95)]
-            if self.request_durations else 0
-        )
-        
-        error_rate = (
-            (self.error_count / self.request_count) * 100
-            if self.request_count > 0 else 0
-        )
-        
-        api_error_rate = (
-            (self.api_error_count / self.api_call_count) * 100
-            if self.api_call_count > 0 else 0
-        )
-        
-        return {
-            "uptime_seconds": uptime,
-            "requests": {
-                "total": self.request_count,
-                "requests_per_second": self.request_count / uptime if uptime > 0 else 0,
-                "avg_duration_ms": avg_duration * 1000,
-                "p95_duration_ms": p95_duration * 1000,
-                "error_count": self.error_count,
-                "error_rate_percent": error_rate
-            },
-            "api_calls": {
-                "total": self.api_call_count,
-                "errors": self.api_error_count,
-                "error_rate_percent": api_error_rate
-            },
-            "business": {
-                "recommendations_generated": self.recommendation_count,
-                "unique_pairs_analyzed": len(self.currency_pairs_analyzed),
-                "top_currency_pairs": dict(
-                    sorted(self.currency_pairs_analyzed.items(), 
-                          key=lambda x: x[1], reverse=True)[:5]
-                )
-            },
-            "timestamp": now.isoformat()
-        }
-    
-    def reset_metrics(self):
-        """Reset all metrics (useful for periodic reporting)"""
-        self.__init__()
+# Prometheus request metrics, scraped from /metrics in the exposition format
+REQ_LAT = Histogram("http_request_duration_seconds", "HTTP request latency in seconds")
+REQ_COUNT = PrometheusCounter("http_requests_total", "HTTP requests by response status", ["status"])
 
-# Global metrics collector instance
-metrics = MetricsCollector()
+def metrics_app():
+    """ASGI app serving /metrics
+    
+    Under gunicorn each worker has its own registry, so when
+    PROMETHEUS_MULTIPROC_DIR is set the scrape aggregates every worker's
+    values from that directory instead of reporting one worker's.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return make_asgi_app(registry=registry)
+    return make_asgi_app()
 
 class HealthChecker:
     """Health check utilities"""
@@ -133,68 +63,79 @@ class HealthChecker:
         """Check database connectivity"""
         try:
             from ..core.database import engine
-            with engine.connect() as conn:
-                conn.execute("SELECT 1")
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
             return {"status": "healthy", "details": "Database connection successful"}
         except Exception as e:
             logger.error("Database health check failed", error=str(e))
             return {"status": "unhealthy", "details": f"Database error: {str(e)}"}
     
-    @staticmethod
-    async def check_external_apis():
+    @classmethod
+    async def _probe(cls, url: str) -> Dict:
+        """Probe a single external API and time the round trip"""
+        start_time = time.perf_counter()
+        try:
+            session = await http_client.get_session()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status == 200:
+                    response_time_ms = (time.perf_counter() - start_time) * 1000
+                    return {"status": "healthy", "response_time_ms": round(response_time_ms, 2)}
+                return {"status": "unhealthy", "details": f"HTTP {response.status}"}
+        except Exception as e:
+            return {"status": "unhealthy", "details": str(e)}
+    
+    @classmethod
+    async def check_external_apis(cls):
         """Check external API availability"""
         checks = {}
+        probes = {}
         
         # Check Alpha Vantage
         if settings.ALPHA_VANTAGE_API_KEY:
-            try:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        f"{settings.ALPHA_VANTAGE_BASE_URL}?function=CURRENCY_EXCHANGE_RATE&from_currency=USD&to_currency=EUR&apikey={settings.ALPHA_VANTAGE_API_KEY}",
-                        timeout=aiohttp.ClientTimeout(total=5)
-                    ) as response:
-                        if response.status == 200:
-                            checks["alpha_vantage"] = {"status": "healthy", "response_time_ms": 0}
-                        else:
-                            checks["alpha_vantage"] = {"status": "unhealthy", "details": f"HTTP {response.status}"}
-            except Exception as e:
-                checks["alpha_vantage"] = {"status": "unhealthy", "details": str(e)}
+            probes["alpha_vantage"] = cls._probe(
+                f"{settings.ALPHA_VANTAGE_BASE_URL}?function=CURRENCY_EXCHANGE_RATE&from_currency=USD&to_currency=EUR&apikey={settings.ALPHA_VANTAGE_API_KEY}"
+            )
         else:
             checks["alpha_vantage"] = {"status": "not_configured", "details": "API key not provided"}
         
         # Check News API
         if settings.NEWS_API_KEY:
-            try:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        f"{settings.NEWS_API_BASE_URL}/top-headlines?country=us&apiKey={settings.NEWS_API_KEY}",
-                        timeout=aiohttp.ClientTimeout(total=5)
-                    ) as response:
-                        if response.status == 200:
-                            checks["news_api"] = {"status": "healthy", "response_time_ms": 0}
-                        else:
-                            checks["news_api"] = {"status": "unhealthy", "details": f"HTTP {response.status}"}
-            except Exception as e:
-                checks["news_api"] = {"status": "unhealthy", "details": str(e)}
+            probes["news_api"] = cls._probe(
+                f"{settings.NEWS_API_BASE_URL}/top-headlines?country=us&apiKey={settings.NEWS_API_KEY}"
+            )
         else:
             checks["news_api"] = {"status": "not_configured", "details": "API key not provided"}
         
+        # Run the configured probes concurrently
+        results = await asyncio.gather(*probes.values())
+        checks.update(zip(probes.keys(), results))
+        
         return checks
     
-    @staticmethod
-    def get_system_info():
-        """Get system information"""
-        import psutil
+    _system_info: Optional[Dict] = None
+    _system_info_expires = 0.0
+    
+    @classmethod
+    def get_system_info(cls):
+        """Get system information (memoized for 5 seconds)"""
         import platform
         
-        return {
+        if psutil is None:
+            raise RuntimeError("psutil is not installed")
+        
+        now = time.monotonic()
+        if cls._system_info is not None and now < cls._system_info_expires:
+            return cls._system_info
+        
+        cls._system_info = {
             "python_version": platform.python_version(),
             "platform": platform.platform(),
-            "cpu_percent": psutil.cpu_percent(interval=1),
+            # Non-blocking: usage since the previous call instead of sleeping 1s
+            "cpu_percent": psutil.cpu_percent(interval=None),
             "memory_percent": psutil.virtual_memory().percent,
             "disk_percent": psutil.disk_usage('/').percent,
             "environment": settings.ENVIRONMENT,
             "version": settings.VERSION
-        }
\ No newline at end of file
+        }
+        cls._system_info_expires = now + 5
+        return cls._system_info
\ No newline at end of file
@@ -1,24 +1,28 @@
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import anyio.to_thread
+import orjson
 import time
-from starlette.middleware.base import BaseHTTPMiddleware
 
 from .core.config import settings
 from .core.database import create_tables
 from .core.logging import setup_logging, get_logger
-from .core.monitoring import setup_sentry, metrics, HealthChecker
+from .core.monitoring import setup_sentry, HealthChecker, metrics_app
 from .core.cache import cache
+from .core.http import http_client
 from .middleware.security import (
-    SecurityHeadersMiddleware, 
+    FastPathMiddleware,
+    UnifiedMiddleware,
     RateLimitMiddleware, 
-    RequestLoggingMiddleware,
-    APIKeyValidationMiddleware
+    APIKeyValidationMiddleware,
+    health_body
 )
-from .api.routes import router
+from .api.routes import router, news_service
+from .services.forex_api import ForexUpstreamError
 
 # Setup logging first
 setup_logging()
@@ -33,14 +37,25 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Forex Trading Advisor", version=settings.VERSION, environment=settings.ENVIRONMENT)
     
     try:
+        # Headroom for sync handlers/dependencies run in the threadpool (default 40);
+        # database access itself goes through AsyncSession and never uses it
+        anyio.to_thread.current_default_thread_limiter().total_tokens = 100
+        
         # Initialize database
-        create_tables()
+        await create_tables()
         logger.info("Database initialized successfully")
         
         # Initialize cache
         await cache.connect()
         logger.info("Cache initialized successfully")
         
+        # Shared HTTP session for upstream APIs and health probes
+        await http_client.connect()
+        app.state.http = http_client.session
+        
+        # Worker processes for CPU-bound news sentiment scoring
+        news_service.start_process_pool()
+        
         logger.info("Application startup completed successfully")
         
     except Exception as e:
@@ -54,6 +69,10 @@ async def lifespan(app: FastAPI):
     try:
         await cache.disconnect()
         logger.info("Cache disconnected")
+        await http_client.disconnect()
+        logger.info("HTTP client disconnected")
+        news_service.shutdown_process_pool()
+        logger.info("Sentiment worker pool stopped")
         logger.info("Application shutdown completed")
     except Exception as e:
         logger.error("Error during shutdown", error=str(e))
@@ -64,6 +83,7 @@ app = FastAPI(
     version=settings.VERSION,
     description=settings.DESCRIPTION,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.is_development else None,
     redoc_url="/redoc" if settings.is_development else None,
     openapi_url="/openapi.json" if settings.is_development else None,
@@ -73,9 +93,7 @@ app = FastAPI(
 if settings.is_production:
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.ALLOWED_HOSTS)
 
-app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(RateLimitMiddleware, requests_per_minute=settings.REQUESTS_PER_MINUTE)
-app.add_middleware(RequestLoggingMiddleware)
 app.add_middleware(APIKeyValidationMiddleware)
 
 # CORS middleware
@@ -87,25 +105,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Metrics middleware
-class MetricsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        
-        # Record metrics
-        metrics.record_request(process_time, response.status_code)
-        
-        return response
+# Security headers, request logging and metrics (outermost, so every response is covered)
+app.add_middleware(UnifiedMiddleware)
 
-app.add_middleware(MetricsMiddleware)
+# Health probes and metrics scrapes short-circuit everything above (installed last, runs first)
+app.add_middleware(FastPathMiddleware)
 
 # Exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     logger.warning("Validation error", path=request.url.path, errors=str(exc.errors()))
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "Validation failed",
@@ -117,7 +127,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     logger.warning("HTTP exception", path=request.url.path, status_code=exc.status_code, detail=exc.detail)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": f"HTTP {exc.status_code}",
@@ -125,12 +135,23 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         }
     )
 
+@app.exception_handler(ForexUpstreamError)
+async def forex_upstream_error_handler(request: Request, exc: ForexUpstreamError):
+    logger.warning("Forex upstream error", path=request.url.path, error=str(exc))
+    return ORJSONResponse(
+        status_code=502,
+        content={
+            "error": "Bad gateway",
+            "message": "Unable to reach the forex data provider. Please try again later."
+        }
+    )
+
 @app.exception_handler(500)
 async def internal_server_error_handler(request: Request, exc: Exception):
     logger.error("Internal server error", path=request.url.path, error=str(exc), exc_info=True)
     
     if settings.is_production:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Internal server error",
@@ -138,7 +159,7 @@ async def internal_server_error_handler(request: Request, exc: Exception):
             }
         )
     else:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Internal server error",
@@ -150,31 +171,44 @@ async def internal_server_error_handler(request: Request, exc: Exception):
 # Include API routes
 app.include_router(router, prefix="/api/v1", tags=["forex"])
 
+# Static response bodies, serialized once at import
+ROOT_BODY = orjson.dumps({
+    "service": settings.APP_NAME,
+    "version": settings.VERSION,
+    "environment": settings.ENVIRONMENT,
+    "status": "running",
+    "docs": "/docs" if settings.is_development else "disabled",
+    "health": "/api/v1/health"
+})
+# Everything in the 404 body after the (per-request) message
+NOT_FOUND_BODY_TAIL = b',"available_endpoints":' + orjson.dumps([
+    "/api/v1/health",
+    "/api/v1/analyze",
+    "/api/v1/rates/{currency_pair}",
+    "/api/v1/news/{currency_pair}",
+    "/api/v1/history/{currency_pair}",
+    "/api/v1/supported-pairs",
+    "/api/v1/system/health"
+]) + b'}'
+
 # Health and monitoring endpoints
 @app.get("/")
 async def root():
-    return {
-        "service": settings.APP_NAME,
-        "version": settings.VERSION,
-        "environment": settings.ENVIRONMENT,
-        "status": "running",
-        "docs": "/docs" if settings.is_development else "disabled",
-        "health": "/api/v1/health"
-    }
+    return Response(content=ROOT_BODY, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
-    """Simple health check endpoint"""
-    return {"status": "healthy", "timestamp": time.time()}
+    """Simple health check endpoint (normally answered by FastPathMiddleware)"""
+    return Response(content=health_body(), media_type="application/json")
 
-@app.get("/metrics")
-async def get_metrics():
-    """Get application metrics"""
-    if settings.is_production:
-        # In production, you might want to restrict access to this endpoint
+# Prometheus scrape endpoint (disabled in production unless METRICS_ENABLED)
+if settings.metrics_enabled:
+    app.mount("/metrics", metrics_app())
+else:
+    @app.get("/metrics")
+    async def get_metrics():
+        """Metrics are not exposed in production"""
         return {"error": "Metrics endpoint disabled in production"}
-    
-    return metrics.get_metrics()
 
 @app.get("/api/v1/system/health")
 async def detailed_health_check():
@@ -215,32 +249,22 @@ async def detailed_health_check():
         health_data["error"] = str(e)
     
     status_code = 200 if health_data["status"] in ["healthy", "degraded"] else 503
-    return JSONResponse(status_code=status_code, content=health_data)
+    return ORJSONResponse(status_code=status_code, content=health_data)
 
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
-    return JSONResponse(
-        status_code=404,
-        content={
-            "error": "Not found",
-            "message": f"Path '{request.url.path}' not found",
-            "available_endpoints": [
-                "/api/v1/health",
-                "/api/v1/analyze",
-                "/api/v1/rates/{currency_pair}",
-                "/api/v1/news/{currency_pair}",
-                "/api/v1/history/{currency_pair}",
-                "/api/v1/supported-pairs",
-                "/api/v1/system/health"
-            ]
-        }
-    )
+    body = b'{"error":"Not found","message":' + orjson.dumps(f"Path '{request.url.path}' not found") + NOT_FOUND_BODY_TAIL
+    return Response(content=body, status_code=404, media_type="application/json")
 
 if __name__ == "__main__":
+    # Development entry point; production runs under gunicorn (see gunicorn_conf.py)
+    import sys
     import uvicorn
     uvicorn.run(
         app, 
         host=settings.HOST, 
         port=settings.PORT,
-        log_level=settings.LOG_LEVEL.lower()
+        log_level=settings.LOG_LEVEL.lower(),
+        loop="uvloop" if sys.platform != "win32" else "auto",
+        http="httptools"
     )
\ No newline at end of file
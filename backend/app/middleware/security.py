@@ -2,37 +2,123 @@ from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import time
 import hashlib
-from typing import Dict, Set
+from collections import deque
+from typing import Deque, Dict
+from ..core.cache import cache
 from ..core.config import settings
+from ..core.logging import get_logger
+from ..core.monitoring import REQ_COUNT, REQ_LAT
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all responses"""
+logger = get_logger("requests")
+
+# Probe/scrape endpoints that bypass the rest of the middleware stack. In production
+# /metrics (when enabled) stays behind TrustedHost, CORS and rate limiting
+FAST_PATHS = frozenset(
+    {"/health", "/api/v1/health"}
+    | (set() if settings.is_production else {"/metrics", "/metrics/"})
+)
+
+def health_body() -> bytes:
+    """Serialized ``/health`` response body"""
+    return b'{"status":"healthy","timestamp":' + repr(time.time()).encode() + b'}'
+
+class FastPathMiddleware:
+    """Serve health probes and metrics scrapes ahead of the middleware stack
     
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-        
+    Installed outermost. ``/health`` is answered directly; the other fast
+    paths are dispatched straight to the router, skipping rate limiting,
+    logging, API key checks and metrics.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] not in FAST_PATHS:
+            await self.app(scope, receive, send)
+            return
+        
+        if scope["path"] == "/health":
+            body = health_body()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        await scope["app"].router(scope, receive, send)
+
+class UnifiedMiddleware:
+    """Security headers, request timing/logging and metrics in one ASGI layer
+    
+    Implemented as plain ASGI rather than BaseHTTPMiddleware, so responses are
+    not wrapped in an extra task and memory stream per layer.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.security_headers = {
+            "X-Content-Type-Options": "nosniff",
+            "X-Frame-Options": "DENY",
+            "X-XSS-Protection": "1; mode=block",
+            "Referrer-Policy": "strict-origin-when-cross-origin",
+            "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+        }
         if settings.is_production:
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        
-        return response
+            self.security_headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                for name, value in self.security_headers.items():
+                    headers[name] = value
+                headers["X-Process-Time"] = str(time.perf_counter() - start_time)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            process_time = time.perf_counter() - start_time
+            REQ_LAT.observe(process_time)
+            REQ_COUNT.labels(status=str(status_code)).inc()
+            
+            # Log request (queued; the write happens off the event loop)
+            if not settings.is_development:
+                request_headers = Headers(scope=scope)
+                client = scope.get("client")
+                client_ip = request_headers.get("X-Forwarded-For",
+                                                request_headers.get("X-Real-IP",
+                                                client[0] if client else "unknown"))
+                logger.info("request", ip=client_ip, method=scope["method"], path=scope["path"],
+                            status=status_code, ms=round(process_time * 1000, 3))
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware with memory-based storage"""
+    """Rate limiting middleware backed by Redis, with an in-memory fallback"""
     
     def __init__(self, app, requests_per_minute: int = 60):
         super().__init__(app)
         self.requests_per_minute = requests_per_minute
-        self.requests: Dict[str, list] = {}
-        self.blocked_ips: Set[str] = set()
+        # Per-IP sliding window of request timestamps, used when Redis is unavailable
+        self.requests: Dict[str, Deque[float]] = {}
     
     def get_client_ip(self, request: Request) -> str:
         """Get client IP address"""
@@ -44,37 +130,54 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return x_real_ip
         return request.client.host if request.client else "unknown"
     
-    def is_rate_limited(self, client_ip: str) -> bool:
+    async def is_rate_limited(self, client_ip: str) -> bool:
         """Check if client is rate limited"""
         current_time = time.time()
+        
+        # Fixed one-minute window shared by all workers
+        if cache.is_connected and cache.redis_client:
+            try:
+                key = f"rl:{client_ip}:{int(current_time // 60)}"
+                pipe = cache.redis_client.pipeline()
+                pipe.incr(key)
+                pipe.expire(key, 60)
+                count, _ = await pipe.execute()
+                return count > self.requests_per_minute
+            except Exception:
+                # Fall through to the per-process limiter if Redis misbehaves
+                pass
+        
         minute_ago = current_time - 60
         
-        # Clean old requests
-        if client_ip in self.requests:
-            self.requests[client_ip] = [
-                req_time for req_time in self.requests[client_ip] 
-                if req_time > minute_ago
-            ]
+        # Forget idle clients so the table doesn't grow with every IP ever seen
+        if len(self.requests) > 10000:
+            self.requests = {
+                ip: timestamps for ip, timestamps in self.requests.items()
+                if timestamps and timestamps[-1] > minute_ago
+            }
         
-        # Check rate limit
-        if client_ip not in self.requests:
-            self.requests[client_ip] = []
+        window = self.requests.get(client_ip)
+        if window is None:
+            window = self.requests[client_ip] = deque()
         
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
-            self.blocked_ips.add(client_ip)
+        # Drop requests that have left the window
+        while window and window[0] <= minute_ago:
+            window.popleft()
+        
+        if len(window) >= self.requests_per_minute:
             return True
         
-        self.requests[client_ip].append(current_time)
+        window.append(current_time)
         return False
     
     async def dispatch(self, request: Request, call_next):
         client_ip = self.get_client_ip(request)
         
-        # Skip rate limiting for health checks
-        if request.url.path in ["/health", "/api/v1/health"]:
+        # Skip rate limiting for health checks and metrics
+        if request.url.path in FAST_PATHS:
             return await call_next(request)
         
-        if self.is_rate_limited(client_ip):
+        if await self.is_rate_limited(client_ip):
             return JSONResponse(
                 status_code=429,
                 content={
@@ -86,33 +189,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         
         return await call_next(request)
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Log all requests for monitoring"""
-    
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Get client info
-        client_ip = request.headers.get("X-Forwarded-For", 
-                                      request.headers.get("X-Real-IP", 
-                                      request.client.host if request.client else "unknown"))
-        
-        response = await call_next(request)
-        
-        # Calculate processing time
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-        
-        # Log request (in production, use proper logging)
-        if not settings.is_development:
-            print(f"{client_ip} - {request.method} {request.url.path} - {response.status_code} - {process_time:.3f}s")
-        
-        return response
-
 class APIKeyValidationMiddleware(BaseHTTPMiddleware):
     """Validate API keys for sensitive endpoints"""
     
-    PROTECTED_PATHS = ["/api/v1/analyze"]
+    PROTECTED_PATHS = frozenset({"/api/v1/analyze"})
     
     async def dispatch(self, request: Request, call_next):
         # Skip validation for non-protected paths
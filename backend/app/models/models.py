@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Enum
+from sqlalchemy import CheckConstraint, Column, Integer, String, Float, Numeric, DateTime, Text, Index, JSON
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from ..core.database import Base
 import enum
@@ -12,16 +13,19 @@ class ForexRecommendation(Base):
     __tablename__ = "forex_recommendations"
     
     id = Column(Integer, primary_key=True, index=True)
-    currency_pair = Column(String(10), nullable=False, index=True)
-    recommendation = Column(Enum(RecommendationType), nullable=False)
+    # Indexed through the (currency_pair, created_at DESC, id DESC) composite below
+    currency_pair = Column(String(10), nullable=False)
+    # Plain string (one of RecommendationType's values) rather than a native DB enum
+    recommendation = Column(String(4), nullable=False)
     confidence_score = Column(Float, nullable=False)
-    current_rate = Column(Float, nullable=False)
+    # Rate-valued columns use fixed-point storage (Alpha Vantage quotes to 4-6 decimals)
+    current_rate = Column(Numeric(12, 6), nullable=False)
     
     # Technical Analysis
     technical_summary = Column(Text)
-    moving_average_5 = Column(Float)
-    moving_average_20 = Column(Float)
-    moving_average_50 = Column(Float)
+    moving_average_5 = Column(Numeric(12, 6))
+    moving_average_20 = Column(Numeric(12, 6))
+    moving_average_50 = Column(Numeric(12, 6))
     trend_direction = Column(String(20))
     
     # Sentiment Analysis
@@ -40,15 +44,27 @@ class ForexRecommendation(Base):
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Serves history lookups (latest recommendations for a pair) as an index range scan;
+    # id is the tie-breaker of the keyset cursor
+    __table_args__ = (
+        Index('ix_forex_recommendations_pair_created', currency_pair, created_at.desc(), id.desc()),
+        CheckConstraint("recommendation IN ('buy','hold','sell')", name='ck_rec'),
+    )
 
 class ForexRate(Base):
     __tablename__ = "forex_rates"
     
     id = Column(Integer, primary_key=True, index=True)
-    currency_pair = Column(String(10), nullable=False, index=True)
-    rate = Column(Float, nullable=False)
+    currency_pair = Column(String(10), nullable=False)
+    rate = Column(Numeric(12, 6), nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     source = Column(String(50), default="alpha_vantage")
+    
+    # Latest rate for a pair is a single index lookup; also covers pair-only filters
+    __table_args__ = (
+        Index('ix_rates_pair_ts', currency_pair, timestamp.desc()),
+    )
 
 class NewsArticle(Base):
     __tablename__ = "news_articles"
@@ -60,5 +76,10 @@ class NewsArticle(Base):
     url = Column(String(1000))
     published_at = Column(DateTime)
     sentiment_score = Column(Float)
-    currency_pairs_mentioned = Column(String(200))  # JSON string of currency pairs
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    # Native text[] on Postgres (GIN-indexed for ANY() lookups), JSON list elsewhere
+    currency_pairs_mentioned = Column(JSON().with_variant(ARRAY(String(10)), "postgresql"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index('ix_news_pairs', currency_pairs_mentioned, postgresql_using='gin'),
+    )
\ No newline at end of file
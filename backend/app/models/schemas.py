@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -42,6 +42,9 @@ class ForexRecommendationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Built once at import; serializes /analyze responses straight to JSON bytes
+REC_ADAPTER = TypeAdapter(ForexRecommendationResponse)
+
 class ForexRateResponse(BaseModel):
     currency_pair: str
     rate: float
@@ -1,20 +1,145 @@
 import aiohttp
 import asyncio
-from typing import Dict, Optional, List
-from datetime import datetime, timedelta
-import pandas as pd
+from typing import Dict, Optional, List, Tuple
 import numpy as np
+from collections import OrderedDict
+from functools import lru_cache
+from ..core.cache import cache, cache_key_for_forex_daily, cache_key_for_forex_rate
 from ..core.config import settings
+from ..core.http import http_client
+from ..core.logging import get_logger
+
+logger = get_logger("forex_api")
+
+class ForexUpstreamError(Exception):
+    """Raised when the Alpha Vantage request itself fails"""
+
+# MA50 is the longest window used, so only the most recent closes are kept
+MA_HISTORY = 60
+
+# In-process LRU of (closes, cumulative sums) per (currency pair, latest date, latest
+# close); the close is part of the key because the current day's bar updates intraday
+SERIES_CACHE_SIZE = 64
+_series_cache: "OrderedDict[Tuple[str, str, str], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+
+def _closes_and_cumsum(time_series_data: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Build the chronological close array and its zero-prefixed cumulative sums"""
+    # Dates are ISO 'YYYY-MM-DD' strings, so sorting them lexically is
+    # chronological; only the closes need to be materialized
+    items = sorted(time_series_data.items())[-MA_HISTORY:]
+    closes = np.fromiter(
+        (float(values['4. close']) for _, values in items),
+        dtype=np.float64, count=len(items)
+    )
+    
+    # A leading zero lets every window mean be one subtraction of cumulative sums
+    cumsum = np.concatenate(([0.0], np.cumsum(closes)))
+    return closes, cumsum
+
+def calculate_moving_averages(time_series_data: Dict, currency_pair: Optional[str] = None) -> Dict:
+    """Calculate moving averages from time series data
+    
+    When ``currency_pair`` is given, the prepared arrays are memoized per pair
+    and latest date, so a reused (cached) series is not re-parsed.
+    """
+    if not time_series_data:
+        return {}
+    
+    if currency_pair is None:
+        closes, cumsum = _closes_and_cumsum(time_series_data)
+    else:
+        last_date = max(time_series_data)
+        key = (currency_pair, last_date, time_series_data[last_date]['4. close'])
+        series = _series_cache.get(key)
+        if series is None:
+            series = _closes_and_cumsum(time_series_data)
+            _series_cache[key] = series
+            if len(_series_cache) > SERIES_CACHE_SIZE:
+                _series_cache.popitem(last=False)
+        else:
+            _series_cache.move_to_end(key)
+        closes, cumsum = series
+    
+    count = len(closes)
+    
+    def latest_ma(window: int) -> Optional[float]:
+        if count < window:
+            return None
+        return float((cumsum[-1] - cumsum[-window - 1]) / window)
+    
+    ma_5 = latest_ma(5)
+    ma_20 = latest_ma(20)
+    ma_50 = latest_ma(50)
+    current_price = float(closes[-1])
+    
+    # Determine trend direction
+    trend = "neutral"
+    if count >= 20:
+        if current_price > ma_20 and closes[-2] > closes[-3]:
+            trend = "upward"
+        elif current_price < ma_20 and closes[-2] < closes[-3]:
+            trend = "downward"
+    
+    return {
+        'moving_average_5': ma_5,
+        'moving_average_20': ma_20,
+        'moving_average_50': ma_50,
+        'trend_direction': trend,
+        'current_price': current_price
+    }
+
+@lru_cache(maxsize=256)
+def _generate_technical_summary(trend: str, ma_20: Optional[float], current_rate: float) -> str:
+    """Generate a summary of technical analysis"""
+    ma_20_str = f"{ma_20:.4f}" if ma_20 else "N/A"
+    
+    if trend == 'upward':
+        return f"Technical analysis shows an upward trend. Current rate ({current_rate:.4f}) is above the 20-day moving average ({ma_20_str}), indicating bullish momentum."
+    elif trend == 'downward':
+        return f"Technical analysis shows a downward trend. Current rate ({current_rate:.4f}) is below the 20-day moving average ({ma_20_str}), indicating bearish momentum."
+    else:
+        return f"Technical analysis shows a neutral trend. Current rate is {current_rate:.4f}. Market direction is unclear based on moving averages."
 
 class ForexAPIService:
+    # Cache TTLs (seconds): spot rates go stale quickly, daily bars change once a day,
+    # and upstream errors (rate-limit notes) are remembered briefly to avoid hammering
+    RATE_CACHE_TTL = 30
+    DAILY_CACHE_TTL = 6 * 60 * 60
+    ERROR_CACHE_TTL = 5
+    
     def __init__(self):
         self.base_url = settings.ALPHA_VANTAGE_BASE_URL
         self.api_key = settings.ALPHA_VANTAGE_API_KEY
+        # Requests go through the shared pooled session; cap each upstream call
+        self.timeout = aiohttp.ClientTimeout(total=10)
+    
+    async def _get_cached(self, cache_key: str) -> Tuple[bool, Optional[Dict]]:
+        """Look up a cached upstream response, returning (hit, value)
         
-    async def get_exchange_rate(self, from_currency: str, to_currency: str) -> Optional[Dict]:
+        A remembered upstream error is raised again, so retries inside
+        ERROR_CACHE_TTL fail the same way as the original call.
+        """
+        cached = await cache.get(cache_key)
+        if not cached:
+            return False, None
+        if 'upstream_error' in cached:
+            raise ForexUpstreamError(cached['upstream_error'])
+        return True, cached
+    
+    async def _cache_upstream_error(self, cache_key: str, message: str):
+        """Briefly remember an upstream error so retries don't re-hit the API"""
+        await cache.set(cache_key, {'upstream_error': message}, ttl=self.ERROR_CACHE_TTL)
+        
+    async def get_exchange_rate(self, from_currency: str, to_currency: str, force_refresh: bool = False) -> Optional[Dict]:
         """Get real-time exchange rate from Alpha Vantage"""
         if not self.api_key:
             raise ValueError("Alpha Vantage API key not configured")
+        
+        cache_key = cache_key_for_forex_rate(from_currency, to_currency)
+        if not force_refresh:
+            hit, cached = await self._get_cached(cache_key)
+            if hit:
+                return cached
             
         params = {
             'function': 'CURRENCY_EXCHANGE_RATE',
@@ -23,33 +148,44 @@ class ForexAPIService:
             'apikey': self.api_key
         }
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if 'Realtime Currency Exchange Rate' in data:
-                            rate_data = data['Realtime Currency Exchange Rate']
-                            return {
-                                'from_currency': rate_data['1. From_Currency Code'],
-                                'to_currency': rate_data['3. To_Currency Code'],
-                                'rate': float(rate_data['5. Exchange Rate']),
-                                'last_refreshed': rate_data['6. Last Refreshed'],
-                                'timezone': rate_data['7. Time Zone']
-                            }
-                        elif 'Error Message' in data:
-                            raise ValueError(f"API Error: {data['Error Message']}")
-                        elif 'Note' in data:
-                            raise ValueError(f"API Rate Limit: {data['Note']}")
-                    return None
-            except Exception as e:
-                print(f"Error fetching exchange rate: {str(e)}")
+        session = await http_client.get_session()
+        try:
+            async with session.get(self.base_url, params=params, timeout=self.timeout) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if 'Realtime Currency Exchange Rate' in data:
+                        rate_data = data['Realtime Currency Exchange Rate']
+                        result = {
+                            'from_currency': rate_data['1. From_Currency Code'],
+                            'to_currency': rate_data['3. To_Currency Code'],
+                            'rate': float(rate_data['5. Exchange Rate']),
+                            'last_refreshed': rate_data['6. Last Refreshed'],
+                            'timezone': rate_data['7. Time Zone']
+                        }
+                        await cache.set(cache_key, result, ttl=self.RATE_CACHE_TTL)
+                        return result
+                    elif 'Error Message' in data:
+                        await self._cache_upstream_error(cache_key, data['Error Message'])
+                        raise ValueError(f"API Error: {data['Error Message']}")
+                    elif 'Note' in data:
+                        await self._cache_upstream_error(cache_key, data['Note'])
+                        raise ValueError(f"API Rate Limit: {data['Note']}")
                 return None
+        except Exception as e:
+            logger.exception("forex upstream failed", function="CURRENCY_EXCHANGE_RATE")
+            raise ForexUpstreamError(str(e)) from e
     
-    async def get_daily_time_series(self, from_currency: str, to_currency: str, outputsize: str = "compact") -> Optional[Dict]:
+    async def get_daily_time_series(self, from_currency: str, to_currency: str, outputsize: str = "compact",
+                                    force_refresh: bool = False) -> Optional[Dict]:
         """Get daily time series data for technical analysis"""
         if not self.api_key:
             raise ValueError("Alpha Vantage API key not configured")
+        
+        cache_key = cache_key_for_forex_daily(from_currency, to_currency, outputsize)
+        if not force_refresh:
+            hit, cached = await self._get_cached(cache_key)
+            if hit:
+                return cached
             
         params = {
             'function': 'FX_DAILY',
@@ -59,74 +195,44 @@ class ForexAPIService:
             'apikey': self.api_key
         }
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if f'Time Series FX (Daily)' in data:
-                            return data['Time Series FX (Daily)']
-                        elif 'Error Message' in data:
-                            raise ValueError(f"API Error: {data['Error Message']}")
-                        elif 'Note' in data:
-                            raise ValueError(f"API Rate Limit: {data['Note']}")
-                    return None
-            except Exception as e:
-                print(f"Error fetching time series data: {str(e)}")
+        session = await http_client.get_session()
+        try:
+            async with session.get(self.base_url, params=params, timeout=self.timeout) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if f'Time Series FX (Daily)' in data:
+                        time_series = data['Time Series FX (Daily)']
+                        await cache.set(cache_key, time_series, ttl=self.DAILY_CACHE_TTL)
+                        return time_series
+                    elif 'Error Message' in data:
+                        await self._cache_upstream_error(cache_key, data['Error Message'])
+                        raise ValueError(f"API Error: {data['Error Message']}")
+                    elif 'Note' in data:
+                        await self._cache_upstream_error(cache_key, data['Note'])
+                        raise ValueError(f"API Rate Limit: {data['Note']}")
                 return None
+        except Exception as e:
+            logger.exception("forex upstream failed", function="FX_DAILY")
+            raise ForexUpstreamError(str(e)) from e
     
-    def calculate_moving_averages(self, time_series_data: Dict) -> Dict:
-        """Calculate moving averages from time series data"""
-        if not time_series_data:
-            return {}
-            
-        # Convert to DataFrame for easier manipulation
-        df_data = []
-        for date, values in time_series_data.items():
-            df_data.append({
-                'date': datetime.strptime(date, '%Y-%m-%d'),
-                'close': float(values['4. close'])
-            })
-        
-        df = pd.DataFrame(df_data)
-        df = df.sort_values('date')
-        
-        # Calculate moving averages
-        df['ma_5'] = df['close'].rolling(window=5).mean()
-        df['ma_20'] = df['close'].rolling(window=20).mean()
-        df['ma_50'] = df['close'].rolling(window=50).mean()
-        
-        # Get the latest values
-        latest = df.iloc[-1]
-        
-        # Determine trend direction
-        trend = "neutral"
-        if len(df) >= 20:
-            current_price = latest['close']
-            ma_20 = latest['ma_20']
-            
-            if current_price > ma_20 and df.iloc[-2]['close'] > df.iloc[-3]['close']:
-                trend = "upward"
-            elif current_price < ma_20 and df.iloc[-2]['close'] < df.iloc[-3]['close']:
-                trend = "downward"
+    async def get_technical_analysis(self, currency_pair: str, force_refresh: bool = False) -> Dict:
+        """Get comprehensive technical analysis for a currency pair
         
-        return {
-            'moving_average_5': latest['ma_5'] if not pd.isna(latest['ma_5']) else None,
-            'moving_average_20': latest['ma_20'] if not pd.isna(latest['ma_20']) else None,
-            'moving_average_50': latest['ma_50'] if not pd.isna(latest['ma_50']) else None,
-            'trend_direction': trend,
-            'current_price': latest['close']
-        }
-    
-    async def get_technical_analysis(self, currency_pair: str) -> Dict:
-        """Get comprehensive technical analysis for a currency pair"""
+        ``force_refresh`` bypasses the cached rate and daily series.
+        """
         from_currency, to_currency = currency_pair.split('/')
         
-        # Get current rate
-        current_rate = await self.get_exchange_rate(from_currency, to_currency)
+        # Fetch the current rate and the daily history for moving averages concurrently
+        current_rate, time_series = await asyncio.gather(
+            self.get_exchange_rate(from_currency, to_currency, force_refresh=force_refresh),
+            self.get_daily_time_series(from_currency, to_currency, force_refresh=force_refresh),
+            return_exceptions=True
+        )
         
-        # Get historical data for moving averages
-        time_series = await self.get_daily_time_series(from_currency, to_currency)
+        # Let configuration and upstream errors propagate to the route
+        for result in (current_rate, time_series):
+            if isinstance(result, Exception):
+                raise result
         
         if not current_rate or not time_series:
             return {
@@ -139,10 +245,15 @@ class ForexAPIService:
             }
         
         # Calculate technical indicators
-        technical_data = self.calculate_moving_averages(time_series)
+        technical_data = calculate_moving_averages(time_series, currency_pair)
         
-        # Generate summary
-        summary = self._generate_technical_summary(technical_data, current_rate['rate'])
+        # Generate summary (rounded to the displayed precision so repeats hit the cache)
+        ma_20 = technical_data.get('moving_average_20')
+        summary = _generate_technical_summary(
+            technical_data.get('trend_direction', 'unknown'),
+            round(ma_20, 4) if ma_20 is not None else None,
+            round(current_rate['rate'], 4)
+        )
         
         return {
             'current_rate': current_rate['rate'],
@@ -152,17 +263,3 @@ class ForexAPIService:
             'trend_direction': technical_data.get('trend_direction', 'unknown'),
             'summary': summary
         }
-    
-    def _generate_technical_summary(self, technical_data: Dict, current_rate: float) -> str:
-        """Generate a summary of technical analysis"""
-        trend = technical_data.get('trend_direction', 'unknown')
-        ma_20 = technical_data.get('moving_average_20')
-        
-        ma_20_str = f"{ma_20:.4f}" if ma_20 else "N/A"
-        
-        if trend == 'upward':
-            return f"Technical analysis shows an upward trend. Current rate ({current_rate:.4f}) is above the 20-day moving average ({ma_20_str}), indicating bullish momentum."
-        elif trend == 'downward':
-            return f"Technical analysis shows a downward trend. Current rate ({current_rate:.4f}) is below the 20-day moving average ({ma_20_str}), indicating bearish momentum."
-        else:
-            return f"Technical analysis shows a neutral trend. Current rate is {current_rate:.4f}. Market direction is unclear based on moving averages."
\ No newline at end of file
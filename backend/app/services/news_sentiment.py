@@ -1,15 +1,90 @@
 import aiohttp
 import asyncio
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import re
 import json
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from textblob import TextBlob
 import feedparser
 from bs4 import BeautifulSoup
+from ..core.cache import cache, cache_key_for_news_api
 from ..core.config import settings
+from ..core.http import http_client
+from ..core.logging import get_logger
+from ..utils.text import keyword_regex
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; keyword scans fall back to loops
+    ahocorasick = None
+
+try:
+    import ciso8601
+except ImportError:  # optional C parser for ISO 8601 dates
+    ciso8601 = None
+
+try:
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+except ImportError:  # nltk comes with textblob, but keep TextBlob as the fallback
+    SentimentIntensityAnalyzer = None
+
+logger = get_logger("news_sentiment")
+
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}T")
+
+# Non-ISO formats seen in feeds; the pattern picks the format up front so
+# parsing never relies on strptime raising ValueError for the wrong one
+_DATE_FORMATS = (
+    (re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"), '%Y-%m-%d %H:%M:%S'),
+    (re.compile(r"\d{4}-\d{2}-\d{2}"), '%Y-%m-%d'),
+    (re.compile(r"[A-Z][a-z]{2}, \d{1,2} [A-Z][a-z]{2} \d{4} \d{2}:\d{2}:\d{2} [A-Z]+"), '%a, %d %b %Y %H:%M:%S %Z'),
+)
+
+# Per-process VADER analyzer (False once it is known to be unavailable)
+_vader = None
+
+def _get_vader():
+    """Create this process's VADER analyzer on first use; needs the vader_lexicon
+    nltk data package, otherwise scoring falls back to TextBlob"""
+    global _vader
+    if _vader is None:
+        _vader = False
+        if SentimentIntensityAnalyzer is not None:
+            try:
+                _vader = SentimentIntensityAnalyzer()
+            except LookupError:
+                pass
+    return _vader or None
+
+def _batch_polarity(texts: List[str]) -> List[float]:
+    """Score sentiment polarity (-1 to 1) for a batch of texts (runs in a worker)"""
+    vader = _get_vader()
+    if vader is not None:
+        return [vader.polarity_scores(text)['compound'] for text in texts]
+    return [TextBlob(text).sentiment.polarity for text in texts]
+
+# Titles whose word sets overlap at least this much (Jaccard) are treated as copies.
+# A source prefix/suffix or one added word keeps a headline of 4+ words above it,
+# while two short headlines that differ in a key word ("rises"/"falls") fall below
+TITLE_SIMILARITY_THRESHOLD = 0.8
+
+def _title_tokens(title: str) -> frozenset:
+    """Lowercase word tokens of a title"""
+    return frozenset(re.findall(r'\w+', title.lower()))
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two token sets (0 when both are empty)"""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
 
 class NewsSentimentService:
+    # News API results change slowly and count against a daily quota
+    NEWS_API_CACHE_TTL = 15 * 60
+    
     def __init__(self):
         self.news_api_key = settings.NEWS_API_KEY
         self.news_api_url = settings.NEWS_API_BASE_URL
@@ -38,9 +113,49 @@ class NewsSentimentService:
             'war', 'conflict', 'sanctions', 'election', 'political', 'trade deal',
             'diplomatic', 'military', 'terrorism', 'coup', 'brexit', 'pandemic'
         ]
+        
+        # Aho-Corasick automata match every keyword of a dictionary in one pass
+        self._ac_currency = None
+        self._ac_events = None
+        if ahocorasick is not None:
+            self._ac_currency = ahocorasick.Automaton()
+            for currency, keywords in self.currency_keywords.items():
+                for keyword in keywords:
+                    self._ac_currency.add_word(keyword, self._ac_currency.get(keyword, ()) + (currency,))
+            self._ac_currency.make_automaton()
+            
+            # Payloads carry the keyword's list position so the first listed match wins
+            self._ac_events = ahocorasick.Automaton()
+            for category, keywords in (('economic', self.economic_keywords),
+                                       ('geopolitical', self.geopolitical_keywords)):
+                for index, keyword in enumerate(keywords):
+                    self._ac_events.add_word(keyword, self._ac_events.get(keyword, ()) + ((category, index),))
+            self._ac_events.make_automaton()
+        else:
+            # Without pyahocorasick, one precompiled alternation per keyword group
+            # still scans each text in C rather than once per keyword
+            self._currency_res = {
+                currency: keyword_regex(keywords)
+                for currency, keywords in self.currency_keywords.items()
+            }
+            # Overlapping matches, tried in list order at each position, so the
+            # lowest keyword index among the hits is the first listed keyword found
+            self._economic_re = keyword_regex(self.economic_keywords, overlapping=True)
+            self._geopolitical_re = keyword_regex(self.geopolitical_keywords, overlapping=True)
+            self._economic_index = {keyword: index for index, keyword in enumerate(self.economic_keywords)}
+            self._geopolitical_index = {keyword: index for index, keyword in enumerate(self.geopolitical_keywords)}
+        
+        # CPU-bound sentiment scoring runs here; started/stopped by the app lifespan
+        self._proc_pool: Optional[ProcessPoolExecutor] = None
+        
+        # Caps in-flight outbound news requests (News API and RSS feeds)
+        self._fetch_semaphore = asyncio.Semaphore(settings.NEWS_FETCH_CONCURRENCY)
+        
+        # Per-feed validators and parsed result: url -> (etag, last_modified, feed)
+        self._feed_cache: Dict[str, Tuple[Optional[str], Optional[str], feedparser.FeedParserDict]] = {}
 
-    async def fetch_news_articles(self, currency_pair: str, days: int = 7) -> List[Dict]:
-        """Fetch news articles related to the currency pair"""
+    async def fetch_news_articles(self, currency_pair: str, days: int = 7, force_refresh: bool = False) -> List[Dict]:
+        """Fetch news articles related to the currency pair (``force_refresh`` skips the News API cache)"""
         articles = []
         
         # Extract currencies from pair
@@ -48,7 +163,7 @@ class NewsSentimentService:
         
         # Fetch from News API if available
         if self.news_api_key:
-            news_api_articles = await self._fetch_from_news_api(currencies, days)
+            news_api_articles = await self._fetch_from_news_api(currencies, days, force_refresh)
             articles.extend(news_api_articles)
         
         # Always fetch from RSS feeds as backup
@@ -60,8 +175,17 @@ class NewsSentimentService:
         
         return articles[:20]  # Limit to 20 most relevant articles
     
-    async def _fetch_from_news_api(self, currencies: List[str], days: int) -> List[Dict]:
-        """Fetch articles from News API"""
+    async def _fetch_from_news_api(self, currencies: List[str], days: int, force_refresh: bool = False) -> List[Dict]:
+        """Fetch articles from News API (cached for NEWS_API_CACHE_TTL seconds)"""
+        cache_key = cache_key_for_news_api(currencies, days)
+        cached = None if force_refresh else await cache.get(cache_key)
+        if cached:
+            # Dates are cached as ISO strings; copy so the cached entry stays intact
+            return [
+                {**article, 'published_at': datetime.fromisoformat(article['published_at']) if article.get('published_at') else None}
+                for article in cached
+            ]
+        
         articles = []
         
         # Build search query
@@ -80,23 +204,33 @@ class NewsSentimentService:
             'apiKey': self.news_api_key
         }
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(f"{self.news_api_url}/everything", params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('status') == 'ok':
-                            for article in data.get('articles', [])[:10]:
-                                articles.append({
-                                    'title': article.get('title', ''),
-                                    'content': article.get('description', ''),
-                                    'source': article.get('source', {}).get('name', 'News API'),
-                                    'url': article.get('url', ''),
-                                    'published_at': self._parse_date(article.get('publishedAt', '')),
-                                    'currency_pairs_mentioned': currencies
-                                })
-            except Exception as e:
-                print(f"Error fetching from News API: {str(e)}")
+        session = await http_client.get_session()
+        try:
+            async with self._fetch_semaphore, session.get(f"{self.news_api_url}/everything", params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if data.get('status') == 'ok':
+                        for article in data.get('articles', [])[:10]:
+                            title = article.get('title', '')
+                            content = article.get('description', '')
+                            articles.append({
+                                'title': title,
+                                'content': content,
+                                'source': article.get('source', {}).get('name', 'News API'),
+                                'url': article.get('url', ''),
+                                'published_at': self._parse_date(article.get('publishedAt', '')),
+                                'currency_pairs_mentioned': currencies,
+                                'text_lower': f"{title} {content}".lower()
+                            })
+        except Exception as e:
+            logger.warning("News API request failed", error=str(e))
+        
+        # Empty results (errors, quota notes) are not cached so the next call retries
+        if articles:
+            await cache.set(cache_key, [
+                {**article, 'published_at': article['published_at'].isoformat() if article['published_at'] else None}
+                for article in articles
+            ], ttl=self.NEWS_API_CACHE_TTL)
         
         return articles
     
@@ -112,41 +246,93 @@ class NewsSentimentService:
             'https://www.fxstreet.com/rss/news'
         ]
         
-        for feed_url in rss_feeds:
+        # Download all feeds concurrently; parsing runs in a worker thread
+        session = await http_client.get_session()
+        feeds = await asyncio.gather(
+            *(self._fetch_feed(session, feed_url) for feed_url in rss_feeds),
+            return_exceptions=True
+        )
+        
+        for feed_url, feed in zip(rss_feeds, feeds):
+            if isinstance(feed, Exception):
+                logger.warning("RSS feed fetch failed", feed_url=feed_url, error=str(feed))
+                continue
+            
             try:
-                feed = feedparser.parse(feed_url)
                 for entry in feed.entries[:5]:  # Limit per feed
-                    # Check if article is relevant to currencies
-                    title_lower = entry.title.lower()
-                    description_lower = getattr(entry, 'description', '').lower()
-                    
-                    is_relevant = False
-                    mentioned_currencies = []
+                    # Lowercase once; the relevance check and analyze_sentiment share it
+                    description = getattr(entry, 'description', '')
+                    text_lower = f"{entry.title} {description}".lower()
                     
-                    for currency in currencies:
-                        if currency in self.currency_keywords:
-                            for keyword in self.currency_keywords[currency]:
-                                if keyword in title_lower or keyword in description_lower:
-                                    is_relevant = True
-                                    mentioned_currencies.append(currency)
-                                    break
+                    # Check if article is relevant to currencies
+                    mentioned_currencies = self._mentioned_currencies(currencies, text_lower)
                     
-                    if is_relevant:
+                    if mentioned_currencies:
                         articles.append({
                             'title': entry.title,
-                            'content': getattr(entry, 'description', ''),
+                            'content': description,
                             'source': feed.feed.get('title', 'RSS Feed'),
                             'url': entry.link,
                             'published_at': self._parse_date(getattr(entry, 'published', '')),
-                            'currency_pairs_mentioned': mentioned_currencies
+                            'currency_pairs_mentioned': mentioned_currencies,
+                            'text_lower': text_lower
                         })
             except Exception as e:
-                print(f"Error fetching RSS feed {feed_url}: {str(e)}")
+                logger.warning("RSS feed parse failed", feed_url=feed_url, error=str(e))
                 continue
         
         return articles
     
-    def analyze_sentiment(self, articles: List[Dict]) -> Dict:
+    async def _fetch_feed(self, session: aiohttp.ClientSession, feed_url: str):
+        """Download a single RSS feed and parse it off the event loop.
+        
+        Sends the feed's last ETag/Last-Modified so an unchanged feed comes
+        back as 304 and the previously parsed result is reused.
+        """
+        cached = self._feed_cache.get(feed_url)
+        headers = {}
+        if cached:
+            etag, modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if modified:
+                headers['If-Modified-Since'] = modified
+        
+        async with self._fetch_semaphore:
+            async with session.get(feed_url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 304 and cached:
+                    return cached[2]
+                response.raise_for_status()
+                body = await response.read()
+                etag = response.headers.get('ETag')
+                modified = response.headers.get('Last-Modified')
+        
+        loop = asyncio.get_running_loop()
+        feed = await loop.run_in_executor(None, feedparser.parse, body)
+        if etag or modified:
+            self._feed_cache[feed_url] = (etag, modified, feed)
+        return feed
+    
+    def start_process_pool(self, max_workers: Optional[int] = None):
+        """Start the sentiment worker processes"""
+        if max_workers is None:
+            max_workers = settings.NEWS_SENTIMENT_WORKERS
+        if self._proc_pool is None and max_workers > 0:
+            # spawn: forking a running event loop (and logging threads) is unsafe
+            self._proc_pool = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+    
+    def shutdown_process_pool(self):
+        """Stop the sentiment worker processes"""
+        if self._proc_pool is not None:
+            if sys.version_info >= (3, 9):
+                self._proc_pool.shutdown(cancel_futures=True)
+            else:
+                self._proc_pool.shutdown()
+            self._proc_pool = None
+    
+    async def analyze_sentiment(self, articles: List[Dict]) -> Dict:
         """Analyze sentiment of news articles"""
         if not articles:
             return {
@@ -155,34 +341,37 @@ class NewsSentimentService:
                 'news_count': 0
             }
         
-        sentiment_scores = []
+        texts = []
         economic_events = []
         geopolitical_events = []
         
         for article in articles:
-            # Analyze sentiment of title and content
+            # Analyze sentiment of title and content; the fetchers store the
+            # lowercased text, so it is only built here for other callers
             text = f"{article.get('title', '')} {article.get('content', '')}"
             
             if text.strip():
-                blob = TextBlob(text)
-                sentiment_scores.append(blob.sentiment.polarity)
+                texts.append(text)
                 
                 # Categorize events
-                text_lower = text.lower()
+                text_lower = article.get('text_lower')
+                if text_lower is None:
+                    text_lower = text.lower()
+                
+                economic_keyword, geopolitical_keyword = self._first_event_keywords(text_lower)
                 
                 # Check for economic events
-                for keyword in self.economic_keywords:
-                    if keyword in text_lower:
-                        economic_events.append(f"{keyword.title()} mentioned in: {article.get('title', '')[:50]}...")
-                        break
+                if economic_keyword:
+                    economic_events.append(f"{economic_keyword.title()} mentioned in: {article.get('title', '')[:50]}...")
                 
                 # Check for geopolitical events
-                for keyword in self.geopolitical_keywords:
-                    if keyword in text_lower:
-                        geopolitical_events.append(f"{keyword.title()} mentioned in: {article.get('title', '')[:50]}...")
-                        break
+                if geopolitical_keyword:
+                    geopolitical_events.append(f"{geopolitical_keyword.title()} mentioned in: {article.get('title', '')[:50]}...")
         
-        # Calculate overall sentiment
+        # Score all texts in one batch off the event loop (in the process pool when
+        # started, otherwise the default thread executor), then calculate overall sentiment
+        loop = asyncio.get_running_loop()
+        sentiment_scores = await loop.run_in_executor(self._proc_pool, _batch_polarity, texts)
         avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0.0
         
         # Generate summary
@@ -196,6 +385,46 @@ class NewsSentimentService:
             'geopolitical_events': geopolitical_events[:5]  # Top 5
         }
     
+    def _mentioned_currencies(self, currencies: List[str], *texts: str) -> List[str]:
+        """Return the currencies (in pair order) whose keywords appear in any text"""
+        if self._ac_currency is not None:
+            hits = set()
+            for text in texts:
+                for _, matched in self._ac_currency.iter(text):
+                    hits.update(matched)
+            return [currency for currency in currencies if currency in hits]
+        
+        return [
+            currency for currency in currencies
+            if currency in self._currency_res
+            and any(self._currency_res[currency].search(text) for text in texts)
+        ]
+    
+    def _first_event_keywords(self, text_lower: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return the first listed economic and geopolitical keyword found in the text"""
+        if self._ac_events is not None:
+            first = {}
+            for _, matched in self._ac_events.iter(text_lower):
+                for category, index in matched:
+                    if category not in first or index < first[category]:
+                        first[category] = index
+            economic = first.get('economic')
+            geopolitical = first.get('geopolitical')
+            return (
+                self.economic_keywords[economic] if economic is not None else None,
+                self.geopolitical_keywords[geopolitical] if geopolitical is not None else None
+            )
+        
+        economic = min(
+            (match.group(1) for match in self._economic_re.finditer(text_lower)),
+            key=self._economic_index.__getitem__, default=None
+        )
+        geopolitical = min(
+            (match.group(1) for match in self._geopolitical_re.finditer(text_lower)),
+            key=self._geopolitical_index.__getitem__, default=None
+        )
+        return economic, geopolitical
+    
     def _generate_sentiment_summary(self, sentiment_score: float, article_count: int, 
                                   economic_events: List[str], geopolitical_events: List[str]) -> str:
         """Generate a human-readable sentiment summary"""
@@ -227,16 +456,23 @@ class NewsSentimentService:
     def _remove_duplicate_articles(self, articles: List[Dict]) -> List[Dict]:
         """Remove duplicate articles based on title similarity"""
         unique_articles = []
-        seen_titles = set()
+        seen_prefixes = set()
+        seen_tokens = []
         
         for article in articles:
-            title = article.get('title', '').lower()
-            # Simple deduplication based on first 50 characters
-            title_key = title[:50]
+            title = (article.get('title') or '').lower()
+            # Same first 50 characters (long headlines with a changed tail), or
+            # near-identical word sets (source prefixes/suffixes, an added word)
+            prefix = title[:50]
+            tokens = _title_tokens(title)
+            if prefix in seen_prefixes or any(
+                _jaccard(tokens, seen) >= TITLE_SIMILARITY_THRESHOLD for seen in seen_tokens
+            ):
+                continue
             
-            if title_key not in seen_titles:
-                seen_titles.add(title_key)
-                unique_articles.append(article)
+            seen_prefixes.add(prefix)
+            seen_tokens.append(tokens)
+            unique_articles.append(article)
         
         return unique_articles
     
@@ -246,16 +482,15 @@ class NewsSentimentService:
             return None
         
         try:
-            # Try ISO format first
-            if 'T' in date_str:
+            # ISO 8601 (News API) is the common case
+            if _ISO_DATE_RE.match(date_str):
+                if ciso8601 is not None:
+                    return ciso8601.parse_datetime(date_str)
                 return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
             
-            # Try other common formats
-            for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%a, %d %b %Y %H:%M:%S %Z']:
-                try:
+            for pattern, fmt in _DATE_FORMATS:
+                if pattern.fullmatch(date_str):
                     return datetime.strptime(date_str, fmt)
-                except ValueError:
-                    continue
             
             return None
         except Exception:
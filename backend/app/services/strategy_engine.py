@@ -3,6 +3,77 @@ from datetime import datetime
 import numpy as np
 from ..models.models import RecommendationType
 from ..models.schemas import TechnicalAnalysis, SentimentAnalysis, EventAnalysis
+from ..utils.text import keyword_regex
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the kernels then run as plain Python
+    njit = None
+    prange = range
+
+if njit is None:
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function uncompiled"""
+        return lambda func: func
+
+# Trend directions as kernel inputs (anything else is neutral)
+TREND_CODES = {'upward': 1, 'downward': -1}
+
+# Missing moving averages are passed to the kernels as NaN (no fastmath, so the
+# NaN checks stay valid)
+@njit(cache=True)
+def _tech_score_kernel(rate: float, ma5: float, ma20: float, ma50: float, trend_code: int) -> float:
+    """Technical score (-1 to 1) for a single bar"""
+    score = 0.0
+    factors = 0
+    
+    has_ma5 = ma5 == ma5 and ma5 != 0.0
+    has_ma20 = ma20 == ma20 and ma20 != 0.0
+    has_ma50 = ma50 == ma50 and ma50 != 0.0
+    
+    # Moving average analysis
+    if has_ma5 and has_ma20 and rate > 0:
+        # Price vs MA comparison
+        if rate > ma20:
+            score += 0.3
+        elif rate < ma20:
+            score -= 0.3
+        factors += 1
+        
+        # MA crossover signals
+        if ma5 > ma20:
+            score += 0.2
+        elif ma5 < ma20:
+            score -= 0.2
+        factors += 1
+    
+    if has_ma20 and has_ma50:
+        # Long-term trend
+        if ma20 > ma50:
+            score += 0.2
+        elif ma20 < ma50:
+            score -= 0.2
+        factors += 1
+    
+    # Trend direction
+    if trend_code == 1:
+        score += 0.3
+    elif trend_code == -1:
+        score -= 0.3
+    factors += 1
+    
+    score = score / factors
+    return max(-1.0, min(1.0, score))
+
+@njit(cache=True, parallel=True)
+def _tech_score_batch(rates: np.ndarray, ma5: np.ndarray, ma20: np.ndarray,
+                      ma50: np.ndarray, trend_codes: np.ndarray) -> np.ndarray:
+    """Technical scores for N bars (e.g. a backtest sweep)"""
+    n = rates.shape[0]
+    scores = np.empty(n, dtype=np.float64)
+    for i in prange(n):
+        scores[i] = _tech_score_kernel(rates[i], ma5[i], ma20[i], ma50[i], trend_codes[i])
+    return scores
 
 class StrategyEngine:
     def __init__(self):
@@ -16,6 +87,12 @@ class StrategyEngine:
         # Thresholds for buy/sell decisions
         self.buy_threshold = 0.6
         self.sell_threshold = -0.6
+        
+        # Event impact keywords, compiled once into single-pass alternations
+        self._pos_econ_re = keyword_regex(['rate cut', 'stimulus', 'growth'])
+        self._neg_econ_re = keyword_regex(['rate hike', 'inflation', 'recession'])
+        self._neg_geo_re = keyword_regex(['war', 'conflict', 'sanctions'])
+        self._pos_geo_re = keyword_regex(['deal', 'agreement', 'stability'])
     
     def generate_recommendation(self, 
                               currency_pair: str,
@@ -58,53 +135,76 @@ class StrategyEngine:
             'justification': justification
         }
     
+    def generate_recommendations_batch(self,
+                                       currency_pairs: List[str],
+                                       technical_batch: List[Dict],
+                                       sentiment_batch: List[Dict]) -> List[Dict]:
+        """Generate recommendations for many pairs (e.g. a backtest) in one vectorized step
+        
+        Returns one dict per pair, in order, with the same keys as generate_recommendation.
+        """
+        if not currency_pairs:
+            return []
+        
+        # Scores as a (pairs x factors) array, one column per weighted factor
+        scores = np.empty((len(currency_pairs), 3), dtype=np.float64)
+        scores[:, 0] = self.calculate_technical_scores(technical_batch)
+        scores[:, 1] = [self._calculate_sentiment_score(sentiment_data) for sentiment_data in sentiment_batch]
+        scores[:, 2] = [self._calculate_event_score(sentiment_data) for sentiment_data in sentiment_batch]
+        weights = np.array([self.weights['technical'], self.weights['sentiment'], self.weights['events']])
+        overall = scores @ weights
+        
+        # Same thresholds as _determine_recommendation, applied to every pair at once
+        codes = np.where(overall >= self.buy_threshold, 0, np.where(overall <= self.sell_threshold, 2, 1))
+        decisions = (RecommendationType.BUY, RecommendationType.HOLD, RecommendationType.SELL)
+        
+        results = []
+        for i, currency_pair in enumerate(currency_pairs):
+            technical_score, sentiment_score, event_score = scores[i].tolist()
+            overall_score = float(overall[i])
+            recommendation = decisions[codes[i]]
+            results.append({
+                'recommendation': recommendation,
+                'confidence_score': self._calculate_confidence(technical_score, sentiment_score, event_score),
+                'overall_score': overall_score,
+                'technical_score': technical_score,
+                'sentiment_score': sentiment_score,
+                'event_score': event_score,
+                'justification': self._generate_justification(
+                    currency_pair, recommendation, technical_batch[i], sentiment_batch[i],
+                    technical_score, sentiment_score, event_score, overall_score
+                )
+            })
+        
+        return results
+    
+    @staticmethod
+    def _technical_inputs(technical_data: Dict) -> Tuple[float, float, float, float, int]:
+        """Flatten technical data into kernel inputs (missing values become NaN)"""
+        def value(key: str) -> float:
+            v = technical_data.get(key)
+            return float(v) if v is not None else np.nan
+        
+        return (
+            float(technical_data.get('current_rate') or 0.0),
+            value('moving_average_5'),
+            value('moving_average_20'),
+            value('moving_average_50'),
+            TREND_CODES.get(technical_data.get('trend_direction', 'neutral'), 0)
+        )
+    
     def _calculate_technical_score(self, technical_data: Dict) -> float:
         """Calculate score based on technical analysis (-1 to 1)"""
-        score = 0.0
-        factors = 0
-        
-        current_rate = technical_data.get('current_rate', 0)
-        ma_5 = technical_data.get('moving_average_5')
-        ma_20 = technical_data.get('moving_average_20')
-        ma_50 = technical_data.get('moving_average_50')
-        trend = technical_data.get('trend_direction', 'neutral')
-        
-        # Moving average analysis
-        if ma_5 and ma_20 and current_rate > 0:
-            # Price vs MA comparison
-            if current_rate > ma_20:
-                score += 0.3
-            elif current_rate < ma_20:
-                score -= 0.3
-            factors += 1
-            
-            # MA crossover signals
-            if ma_5 > ma_20:
-                score += 0.2
-            elif ma_5 < ma_20:
-                score -= 0.2
-            factors += 1
-        
-        if ma_20 and ma_50:
-            # Long-term trend
-            if ma_20 > ma_50:
-                score += 0.2
-            elif ma_20 < ma_50:
-                score -= 0.2
-            factors += 1
-        
-        # Trend direction
-        if trend == 'upward':
-            score += 0.3
-        elif trend == 'downward':
-            score -= 0.3
-        factors += 1
-        
-        # Normalize score
-        if factors > 0:
-            score = score / factors
-        
-        return max(-1.0, min(1.0, score))
+        return float(_tech_score_kernel(*self._technical_inputs(technical_data)))
+    
+    def calculate_technical_scores(self, technical_batch: List[Dict]) -> np.ndarray:
+        """Calculate technical scores for many bars in one compiled pass"""
+        if not technical_batch:
+            return np.empty(0, dtype=np.float64)
+        
+        inputs = [self._technical_inputs(technical_data) for technical_data in technical_batch]
+        rates, ma5, ma20, ma50, trend_codes = (np.array(column) for column in zip(*inputs))
+        return _tech_score_batch(rates, ma5, ma20, ma50, trend_codes.astype(np.int64))
     
     def _calculate_sentiment_score(self, sentiment_data: Dict) -> float:
         """Calculate score based on sentiment analysis (-1 to 1)"""
@@ -131,17 +231,17 @@ class StrategyEngine:
         # Economic events analysis
         for event in economic_events:
             event_lower = event.lower()
-            if any(keyword in event_lower for keyword in ['rate cut', 'stimulus', 'growth']):
+            if self._pos_econ_re.search(event_lower):
                 score += 0.2
-            elif any(keyword in event_lower for keyword in ['rate hike', 'inflation', 'recession']):
+            elif self._neg_econ_re.search(event_lower):
                 score -= 0.2
         
         # Geopolitical events analysis
         for event in geopolitical_events:
             event_lower = event.lower()
-            if any(keyword in event_lower for keyword in ['war', 'conflict', 'sanctions']):
+            if self._neg_geo_re.search(event_lower):
                 score -= 0.3
-            elif any(keyword in event_lower for keyword in ['deal', 'agreement', 'stability']):
+            elif self._pos_geo_re.search(event_lower):
                 score += 0.2
         
         return max(-1.0, min(1.0, score))
@@ -157,12 +257,11 @@ class StrategyEngine:
     
     def _calculate_confidence(self, technical_score: float, sentiment_score: float, event_score: float) -> float:
         """Calculate confidence score based on agreement between factors"""
-        scores = [technical_score, sentiment_score, event_score]
-        
-        # Check alignment of scores
-        positive_scores = sum(1 for score in scores if score > 0.1)
-        negative_scores = sum(1 for score in scores if score < -0.1)
-        neutral_scores = sum(1 for score in scores if -0.1 <= score <= 0.1)
+        # Check alignment of scores (plain scalar arithmetic; three values don't
+        # justify building lists or arrays)
+        positive_scores = (technical_score > 0.1) + (sentiment_score > 0.1) + (event_score > 0.1)
+        negative_scores = (technical_score < -0.1) + (sentiment_score < -0.1) + (event_score < -0.1)
+        neutral_scores = 3 - positive_scores - negative_scores
         
         # High confidence when factors agree
         if positive_scores >= 2 and negative_scores == 0:
@@ -176,7 +275,7 @@ class StrategyEngine:
             confidence = 0.5
         
         # Adjust based on score magnitudes
-        avg_magnitude = np.mean([abs(score) for score in scores])
+        avg_magnitude = (abs(technical_score) + abs(sentiment_score) + abs(event_score)) / 3
         confidence *= (0.5 + avg_magnitude * 0.5)
         
         return max(0.0, min(1.0, confidence))
@@ -187,78 +286,79 @@ class StrategyEngine:
                                event_score: float, overall_score: float) -> str:
         """Generate detailed justification for the recommendation"""
         
-        justification = f"**Recommendation: {recommendation.value.upper()}** for {currency_pair}\n\n"
-        justification += f"**Overall Score:** {overall_score:.3f}\n\n"
+        # Collect the sections as parts and join once at the end
+        parts = [f"**Recommendation: {recommendation.value.upper()}** for {currency_pair}\n\n"]
+        parts.append(f"**Overall Score:** {overall_score:.3f}\n\n")
         
         # Technical Analysis Section
-        justification += "**Technical Analysis:**\n"
+        parts.append("**Technical Analysis:**\n")
         current_rate = technical_data.get('current_rate', 0)
         ma_20 = technical_data.get('moving_average_20')
         trend = technical_data.get('trend_direction', 'neutral')
         
-        justification += f"- Current Rate: {current_rate:.4f}\n"
+        parts.append(f"- Current Rate: {current_rate:.4f}\n")
         if ma_20:
-            justification += f"- 20-Day Moving Average: {ma_20:.4f}\n"
+            parts.append(f"- 20-Day Moving Average: {ma_20:.4f}\n")
             if current_rate > ma_20:
-                justification += "- Price is above MA20, indicating bullish momentum\n"
+                parts.append("- Price is above MA20, indicating bullish momentum\n")
             else:
-                justification += "- Price is below MA20, indicating bearish momentum\n"
+                parts.append("- Price is below MA20, indicating bearish momentum\n")
         
-        justification += f"- Trend Direction: {trend.title()}\n"
-        justification += f"- Technical Score: {technical_score:.3f}\n\n"
+        parts.append(f"- Trend Direction: {trend.title()}\n")
+        parts.append(f"- Technical Score: {technical_score:.3f}\n\n")
         
         # Sentiment Analysis Section
-        justification += "**Sentiment Analysis:**\n"
+        parts.append("**Sentiment Analysis:**\n")
         sentiment_score_raw = sentiment_data.get('score', 0)
         news_count = sentiment_data.get('news_count', 0)
         
-        justification += f"- News Articles Analyzed: {news_count}\n"
-        justification += f"- Sentiment Score: {sentiment_score_raw:.3f}\n"
+        parts.append(f"- News Articles Analyzed: {news_count}\n")
+        parts.append(f"- Sentiment Score: {sentiment_score_raw:.3f}\n")
         
         if sentiment_score_raw > 0.1:
-            justification += "- Market sentiment is positive\n"
+            parts.append("- Market sentiment is positive\n")
         elif sentiment_score_raw < -0.1:
-            justification += "- Market sentiment is negative\n"
+            parts.append("- Market sentiment is negative\n")
         else:
-            justification += "- Market sentiment is neutral\n"
+            parts.append("- Market sentiment is neutral\n")
         
-        justification += f"- Weighted Sentiment Score: {sentiment_score:.3f}\n\n"
+        parts.append(f"- Weighted Sentiment Score: {sentiment_score:.3f}\n\n")
         
         # Event Analysis Section
-        justification += "**Event Analysis:**\n"
+        parts.append("**Event Analysis:**\n")
         economic_events = sentiment_data.get('economic_events', [])
         geopolitical_events = sentiment_data.get('geopolitical_events', [])
         
         if economic_events:
-            justification += f"- Economic Events: {len(economic_events)} detected\n"
+            parts.append(f"- Economic Events: {len(economic_events)} detected\n")
             for event in economic_events[:2]:  # Show top 2
-                justification += f"  • {event}\n"
+                parts.append(f"  • {event}\n")
         
         if geopolitical_events:
-            justification += f"- Geopolitical Events: {len(geopolitical_events)} detected\n"
+            parts.append(f"- Geopolitical Events: {len(geopolitical_events)} detected\n")
             for event in geopolitical_events[:2]:  # Show top 2
-                justification += f"  • {event}\n"
+                parts.append(f"  • {event}\n")
         
-        justification += f"- Event Impact Score: {event_score:.3f}\n\n"
+        parts.append(f"- Event Impact Score: {event_score:.3f}\n\n")
         
         # Final Reasoning
-        justification += "**Final Reasoning:**\n"
+        parts.append("**Final Reasoning:**\n")
         
         if recommendation == RecommendationType.BUY:
-            justification += "- Multiple factors align to suggest upward price movement\n"
-            justification += "- Technical indicators show bullish signals\n"
+            parts.append("- Multiple factors align to suggest upward price movement\n")
+            parts.append("- Technical indicators show bullish signals\n")
             if sentiment_score > 0:
-                justification += "- Positive market sentiment supports buying\n"
+                parts.append("- Positive market sentiment supports buying\n")
         elif recommendation == RecommendationType.SELL:
-            justification += "- Multiple factors align to suggest downward price movement\n"
-            justification += "- Technical indicators show bearish signals\n"
+            parts.append("- Multiple factors align to suggest downward price movement\n")
+            parts.append("- Technical indicators show bearish signals\n")
             if sentiment_score < 0:
-                justification += "- Negative market sentiment supports selling\n"
+                parts.append("- Negative market sentiment supports selling\n")
         else:
-            justification += "- Mixed signals suggest maintaining current position\n"
-            justification += "- Wait for clearer market direction before taking action\n"
+            parts.append("- Mixed signals suggest maintaining current position\n")
+            parts.append("- Wait for clearer market direction before taking action\n")
         
-        return justification
+        return "".join(parts)
     
     def update_strategy_weights(self, technical_weight: float, sentiment_weight: float, event_weight: float):
         """Update strategy weights (must sum to 1.0)"""
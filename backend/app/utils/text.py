@@ -0,0 +1,11 @@
+import re
+from typing import Iterable
+
+def keyword_regex(keywords: Iterable[str], overlapping: bool = False) -> re.Pattern:
+    """Compile a substring alternation matching any of the (lowercase) keywords
+    
+    With ``overlapping`` the alternation sits in a lookahead, so ``finditer``
+    reports a match (as group 1) at every position rather than consuming text.
+    """
+    pattern = '|'.join(map(re.escape, keywords))
+    return re.compile(f'(?=({pattern}))' if overlapping else pattern)
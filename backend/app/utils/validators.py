@@ -1,13 +1,28 @@
 import re
+from functools import lru_cache
 from typing import List, Optional
 
+_CURRENCY_PAIR_RE = re.compile(r'^[A-Z]{3}/[A-Z]{3}$')
+
+MAJOR_CURRENCY_PAIRS = (
+    "EUR/USD", "GBP/USD", "USD/JPY", "USD/CHF",
+    "AUD/USD", "USD/CAD", "NZD/USD", "EUR/GBP",
+    "EUR/JPY", "GBP/JPY", "CHF/JPY", "EUR/CHF",
+    "AUD/JPY", "GBP/CHF", "AUD/NZD", "EUR/AUD",
+    "EUR/CAD", "GBP/AUD", "GBP/CAD", "USD/ZAR"
+)
+_MAJOR_PAIRS = frozenset(MAJOR_CURRENCY_PAIRS)
+
+# Spaces are dropped; the other accepted separators become '/'
+_NORMALIZE_TABLE = str.maketrans({'-': '/', '_': '/', ':': '/', ' ': None})
+
+@lru_cache(maxsize=128)
 def validate_currency_pair(currency_pair: str) -> bool:
     """Validate currency pair format (e.g., EUR/USD)"""
     if not currency_pair:
         return False
     
-    pattern = r'^[A-Z]{3}/[A-Z]{3}$'
-    return bool(re.match(pattern, currency_pair))
+    return bool(_CURRENCY_PAIR_RE.match(currency_pair))
 
 def validate_currency_code(currency: str) -> bool:
     """Validate individual currency code"""
@@ -18,30 +33,20 @@ def validate_currency_code(currency: str) -> bool:
 
 def get_major_currency_pairs() -> List[str]:
     """Get list of major currency pairs"""
-    return [
-        "EUR/USD", "GBP/USD", "USD/JPY", "USD/CHF",
-        "AUD/USD", "USD/CAD", "NZD/USD", "EUR/GBP",
-        "EUR/JPY", "GBP/JPY", "CHF/JPY", "EUR/CHF",
-        "AUD/JPY", "GBP/CHF", "AUD/NZD", "EUR/AUD",
-        "EUR/CAD", "GBP/AUD", "GBP/CAD", "USD/ZAR"
-    ]
+    return list(MAJOR_CURRENCY_PAIRS)
 
 def is_supported_currency_pair(currency_pair: str) -> bool:
     """Check if currency pair is supported"""
-    return currency_pair in get_major_currency_pairs()
+    return currency_pair in _MAJOR_PAIRS
 
+@lru_cache(maxsize=128)
 def normalize_currency_pair(currency_pair: str) -> Optional[str]:
     """Normalize currency pair format"""
     if not currency_pair:
         return None
     
-    # Remove spaces and convert to uppercase
-    normalized = currency_pair.replace(' ', '').upper()
-    
-    # Handle different separators
-    for sep in ['-', '_', ':', ' ']:
-        if sep in normalized:
-            normalized = normalized.replace(sep, '/')
+    # Remove spaces, convert to uppercase and unify separators in one pass
+    normalized = currency_pair.upper().translate(_NORMALIZE_TABLE)
     
     # Validate format
     if validate_currency_pair(normalized):
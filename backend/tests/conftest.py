@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Settings are read at import time, so point the app at a throwaway SQLite
+# database before anything under app/ is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
@@ -0,0 +1,40 @@
+from app.services.news_sentiment import NewsSentimentService
+
+LONG_TITLE = "Dollar slips against the euro as traders weigh Federal Reserve comments on inflation"
+
+
+def dedup(*titles):
+    articles = [{"title": title} for title in titles]
+    return [article["title"] for article in NewsSentimentService()._remove_duplicate_articles(articles)]
+
+
+def test_source_prefix_is_duplicate():
+    assert dedup(
+        "ECB raises rates to fight inflation",
+        "Reuters: ECB raises rates to fight inflation"
+    ) == ["ECB raises rates to fight inflation"]
+
+
+def test_added_word_is_duplicate():
+    assert dedup(
+        "ECB raises rates to fight inflation",
+        "ECB raises interest rates to fight inflation"
+    ) == ["ECB raises rates to fight inflation"]
+
+
+def test_source_suffix_is_duplicate():
+    assert dedup(LONG_TITLE, LONG_TITLE + " - Reuters") == [LONG_TITLE]
+
+
+def test_changed_last_word_is_duplicate():
+    assert dedup(LONG_TITLE, LONG_TITLE.rsplit(" ", 1)[0] + " data") == [LONG_TITLE]
+
+
+def test_opposite_short_headlines_are_kept():
+    titles = ("EUR/USD rises as ECB holds rates", "EUR/USD falls as ECB holds rates")
+    assert dedup(*titles) == list(titles)
+
+
+def test_unrelated_headlines_are_kept():
+    titles = ("Yen weakens after BoJ decision", "Sterling steady ahead of UK jobs data")
+    assert dedup(*titles) == list(titles)
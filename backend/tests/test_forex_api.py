@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.core.http import http_client
+from app.services.forex_api import ForexAPIService, ForexUpstreamError
+
+
+class FakeResponse:
+    status = 200
+    
+    def __init__(self, payload):
+        self.payload = payload
+    
+    async def json(self):
+        return self.payload
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+    
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.payload)
+
+
+@pytest.fixture
+def service():
+    service = ForexAPIService()
+    service.api_key = "test"
+    return service
+
+
+def use_session(monkeypatch, payload):
+    session = FakeSession(payload)
+    
+    async def get_session():
+        return session
+    
+    monkeypatch.setattr(http_client, "get_session", get_session)
+    return session
+
+
+def test_cached_rate_limit_note_raises_upstream_error_again(service, monkeypatch):
+    session = use_session(monkeypatch, {"Note": "Thank you for using Alpha Vantage"})
+    
+    async def fetch_twice():
+        for _ in range(2):
+            with pytest.raises(ForexUpstreamError):
+                await service.get_exchange_rate("AAA", "BBB")
+    
+    asyncio.run(fetch_twice())
+    # The retry is answered from the error cache, not upstream
+    assert session.calls == 1
+
+
+def test_force_refresh_bypasses_cached_rate_and_series(service, monkeypatch):
+    session = use_session(monkeypatch, {
+        "Realtime Currency Exchange Rate": {
+            "1. From_Currency Code": "CCC", "3. To_Currency Code": "DDD",
+            "5. Exchange Rate": "1.1", "6. Last Refreshed": "2024-01-01", "7. Time Zone": "UTC"
+        },
+        "Time Series FX (Daily)": {
+            f"2024-01-{day:02d}": {"4. close": str(1 + day / 100)} for day in range(1, 31)
+        }
+    })
+    
+    async def analyze(force_refresh):
+        return await service.get_technical_analysis("CCC/DDD", force_refresh=force_refresh)
+    
+    asyncio.run(analyze(False))
+    asyncio.run(analyze(False))
+    assert session.calls == 2  # second analysis served from cache
+    
+    asyncio.run(analyze(True))
+    assert session.calls == 4
@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+PAIR = "EURUSD"
+
+
+@pytest.fixture
+def client():
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+
+
+@pytest.fixture
+def recommendations(client):
+    """Four rows as SQLite's func.now() stores them; the newest two share a second"""
+    conn = sqlite3.connect(settings.DATABASE_URL.replace("sqlite:///", "", 1))
+    conn.execute("DELETE FROM forex_recommendations")
+    for created_at in ("2024-01-01 10:00:00", "2024-01-01 10:00:01",
+                       "2024-01-01 10:00:02", "2024-01-01 10:00:02"):
+        conn.execute(
+            "INSERT INTO forex_recommendations "
+            "(currency_pair, recommendation, confidence_score, current_rate, justification, created_at) "
+            "VALUES (?, 'hold', 0.5, 1.1, 'test', ?)",
+            (PAIR, created_at)
+        )
+    conn.commit()
+    ids = [row[0] for row in conn.execute("SELECT id FROM forex_recommendations ORDER BY id")]
+    conn.close()
+    return ids
+
+
+def fetch_ids(client, **params):
+    response = client.get(f"/api/v1/history/{PAIR}", params=params)
+    assert response.status_code == 200
+    return [row["id"] for row in response.json()]
+
+
+def test_history_walks_two_pages(client, recommendations):
+    first_page = fetch_ids(client, limit=2)
+    second_page = fetch_ids(client, limit=2, before_id=first_page[-1])
+    
+    assert first_page == recommendations[::-1][:2]
+    assert second_page == recommendations[::-1][2:]
+
+
+def test_history_pages_through_same_second_ties(client, recommendations):
+    seen = []
+    before_id = None
+    while True:
+        params = {"limit": 1}
+        if before_id is not None:
+            params["before_id"] = before_id
+        page = fetch_ids(client, **params)
+        if not page:
+            break
+        seen += page
+        before_id = page[-1]
+    
+    assert seen == recommendations[::-1]
@@ -4,52 +4,210 @@ Forex Strategist Frontend Runner
 """
 import os
 import sys
+import json
+import argparse
+import shutil
+import hashlib
+import functools
+import contextlib
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def check_node_installed():
-    """Check if Node.js is installed"""
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Paths are relative to this script, so it can be run from any directory
+FRONTEND_DIR = Path(__file__).resolve().parent / "frontend"
+NODE_MODULES = FRONTEND_DIR / "node_modules"
+LOCK_FILE = FRONTEND_DIR / "package-lock.json"
+
+# Everything `npm run build` reads, and where it writes
+BUILD_DIR = FRONTEND_DIR / "build"
+BUILD_INPUTS = ("src", "public", "package.json", "package-lock.json",
+                "tailwind.config.js", "postcss.config.js")
+
+# Hash of the package-lock.json that node_modules was last installed from
+INSTALL_STAMP = NODE_MODULES / ".install-stamp"
+
+# Tool versions keyed by resolved binary path, valid while the binary's mtime matches
+VERSION_CACHE = Path.home() / ".cache" / "forex-strategist" / "tool-versions.json"
+
+# Held while installing so concurrent runs don't write the npm cache at once
+INSTALL_LOCK = Path.home() / ".npm" / "_locks" / "forex-strategist.lock"
+
+# npm output lines dropped from install/build logs (npm 7+ lowercases "warn")
+NPM_NOISE = ("npm notice", "npm warn deprecated")
+
+def load_version_cache():
+    """Load cached tool versions"""
     try:
-        result = subprocess.run(["node", "--version"], capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"Node.js version: {result.stdout.strip()}")
-            return True
-    except FileNotFoundError:
+        return json.loads(VERSION_CACHE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def save_version_cache(versions):
+    """Save cached tool versions (best effort; the cache is only a shortcut)"""
+    try:
+        VERSION_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        VERSION_CACHE.write_text(json.dumps(versions, indent=2))
+    except OSError:
         pass
+
+def probe_version(tool, versions):
+    """Return the version of `tool`, or None if it isn't on PATH
+    
+    `<tool> --version` only runs when `versions` has no entry for the
+    resolved binary at its current mtime; new results are stored there.
+    """
+    path = shutil.which(tool)
+    if path is None:
+        return None
+    
+    resolved = os.path.realpath(path)
+    mtime = os.stat(resolved).st_mtime
+    cached = versions.get(resolved)
+    if cached and cached["mtime"] == mtime:
+        return cached["version"]
+    
+    try:
+        result = subprocess.run([path, "--version"], capture_output=True, text=True)
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    
+    version = result.stdout.strip()
+    versions[resolved] = {"mtime": mtime, "version": version}
+    return version
+
+def check_node_installed(version):
+    """Check if Node.js is installed, given its probed version"""
+    if version:
+        print(f"Node.js version: {version}")
+        return True
     
     print("Error: Node.js is not installed or not in PATH")
     print("Please install Node.js from https://nodejs.org/")
     return False
 
-def check_npm_installed():
-    """Check if npm is installed"""
-    try:
-        result = subprocess.run(["npm", "--version"], capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"npm version: {result.stdout.strip()}")
-            return True
-    except FileNotFoundError:
-        pass
+def check_npm_installed(version):
+    """Check if npm is installed, given its probed version"""
+    if version:
+        print(f"npm version: {version}")
+        return True
     
     print("Error: npm is not installed or not in PATH")
     return False
 
-def install_dependencies():
-    """Install frontend dependencies"""
+def npm_env():
+    """Environment for npm commands: no update-notifier or ad chatter, and
+    libuv/npm parallelism sized to the machine unless already set"""
+    cpus = str(os.cpu_count() or 4)
+    return {
+        "UV_THREADPOOL_SIZE": cpus,
+        "NPM_CONFIG_JOBS": cpus,
+        **os.environ,
+        "NPM_CONFIG_UPDATE_NOTIFIER": "false",
+        "ADBLOCK": "1"
+    }
+
+def run_npm(command):
+    """Run an npm command in the frontend directory, streaming its output
+    minus notices and deprecation warnings"""
+    process = subprocess.Popen(
+        command, cwd=FRONTEND_DIR, env=npm_env(),
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
+    )
+    with process:
+        for line in process.stdout:
+            if not line.lower().startswith(NPM_NOISE):
+                sys.stdout.write(line)
+    
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+@contextlib.contextmanager
+def install_lock():
+    """Hold an exclusive lock on INSTALL_LOCK, waiting for other installs to finish"""
+    INSTALL_LOCK.parent.mkdir(parents=True, exist_ok=True)
+    with open(INSTALL_LOCK, "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+def install_dependencies(offline=False, force=False):
+    """Install frontend dependencies (only from the local npm cache when offline)"""
+    with install_lock():
+        # Another run may have installed while this one waited for the lock
+        check_dependencies.cache_clear()
+        if not force and check_dependencies():
+            print("Dependencies were installed by another run")
+            return
+        _install_dependencies(offline)
+
+def _install_dependencies(offline):
+    """Run the install; callers hold the install lock"""
     print("Installing frontend dependencies...")
-    frontend_path = Path("frontend")
+    # npm ci installs straight from the lockfile without re-resolving the tree;
+    # without a lockfile only npm install can work
+    if LOCK_FILE.exists():
+        command = ["npm", "ci"]
+    else:
+        command = ["npm", "install"]
+    # Reuse the local npm cache and skip the audit, funding and progress output
+    command += ["--offline" if offline else "--prefer-offline", "--no-audit", "--no-fund", "--no-progress"]
     
     try:
-        subprocess.run(["npm", "install"], cwd=frontend_path, check=True)
+        run_npm(command)
         print("Dependencies installed successfully!")
+        
+        # Hash after installing, since npm install may write the lockfile
+        lock_hash = lockfile_hash()
+        if lock_hash:
+            INSTALL_STAMP.write_text(lock_hash)
+        check_dependencies.cache_clear()
     except subprocess.CalledProcessError as e:
         print(f"Error installing dependencies: {e}")
         sys.exit(1)
 
+def lockfile_hash():
+    """Return the SHA-256 of package-lock.json, or None if there is none"""
+    try:
+        return hashlib.sha256(LOCK_FILE.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+@functools.lru_cache(maxsize=1)
 def check_dependencies():
-    """Check if node_modules exists"""
-    node_modules = Path("frontend/node_modules")
-    return node_modules.exists()
+    """Check if node_modules is non-empty and was installed from the current package-lock.json"""
+    # One directory read answers both "exists" and "not left empty by an aborted install"
+    try:
+        with os.scandir(NODE_MODULES) as entries:
+            if next(entries, None) is None:
+                return False
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+    
+    lock_hash = lockfile_hash()
+    if lock_hash is None:
+        return True
+    
+    try:
+        return INSTALL_STAMP.read_text().strip() == lock_hash
+    except FileNotFoundError:
+        return False
 
 def run_development_server():
     """Run the React development server"""
@@ -57,45 +215,111 @@ def run_development_server():
     print("Frontend will be available at: http://localhost:3000")
     print("Press Ctrl+C to stop the server")
     
-    frontend_path = Path("frontend")
+    # On POSIX, replace this process with npm: nothing runs after the server exits,
+    # and Ctrl+C then reaches npm directly
+    if os.name == "posix":
+        sys.stdout.flush()
+        os.chdir(FRONTEND_DIR)
+        os.execvpe("npm", ["npm", "start"], npm_env())
     
     try:
-        subprocess.run(["npm", "start"], cwd=frontend_path, check=True)
+        subprocess.run(["npm", "start"], cwd=FRONTEND_DIR, env=npm_env(), check=True)
     except KeyboardInterrupt:
         print("\nShutting down development server...")
     except subprocess.CalledProcessError as e:
         print(f"Error running development server: {e}")
         sys.exit(1)
 
-def build_production():
-    """Build production version"""
+def file_mtimes(path):
+    """Yield the mtimes of all files under path (or of path itself if it is a file)"""
+    try:
+        entries = os.scandir(path)
+    except NotADirectoryError:
+        yield os.stat(path).st_mtime
+        return
+    except FileNotFoundError:
+        return
+    
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from file_mtimes(entry.path)
+            else:
+                yield entry.stat().st_mtime
+
+def build_is_current():
+    """Check if every build output is newer than every build input"""
+    inputs = list(BUILD_INPUTS) + [env_file.name for env_file in FRONTEND_DIR.glob(".env*")]
+    newest_input = max(
+        (mtime for name in inputs for mtime in file_mtimes(FRONTEND_DIR / name)), default=None
+    )
+    oldest_output = min(file_mtimes(BUILD_DIR), default=None)
+    return newest_input is not None and oldest_output is not None and newest_input <= oldest_output
+
+def build_production(force=False):
+    """Build production version, unless the existing build is up to date"""
+    if not force and build_is_current():
+        print("Build up to date (frontend/build/ is newer than its sources)")
+        return
+    
     print("Building production version...")
-    frontend_path = Path("frontend")
     
     try:
-        subprocess.run(["npm", "run", "build"], cwd=frontend_path, check=True)
+        run_npm(["npm", "run", "build"])
         print("Production build completed successfully!")
         print("Build files are in frontend/build/")
     except subprocess.CalledProcessError as e:
         print(f"Error building production version: {e}")
         sys.exit(1)
 
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Forex Strategist frontend runner")
+    parser.add_argument("--install", action="store_true",
+                        help="install dependencies if package-lock.json changed")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="reinstall and rebuild even if nothing changed")
+    parser.add_argument("--offline", action="store_true",
+                        help="install only from the local npm cache")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="npm/libuv parallelism (default: CPU count)")
+    parser.add_argument("--build", action="store_true",
+                        help="build the production bundle instead of starting the dev server")
+    return parser.parse_args()
+
 def main():
     """Main function"""
+    args = parse_args()
+    if args.jobs:
+        # npm_env keeps values already in the environment
+        os.environ["UV_THREADPOOL_SIZE"] = os.environ["NPM_CONFIG_JOBS"] = str(args.jobs)
+    
     print("🎨 Forex Strategist Frontend Setup")
     print("=" * 40)
     
-    # Check if Node.js and npm are installed
-    if not check_node_installed() or not check_npm_installed():
+    # Check if Node.js and npm are installed (cold probes run concurrently)
+    versions = load_version_cache()
+    known_versions = dict(versions)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        node_version, npm_version = executor.map(
+            lambda tool: probe_version(tool, versions), ["node", "npm"]
+        )
+    if versions != known_versions:
+        save_version_cache(versions)
+    node_ok = check_node_installed(node_version)
+    npm_ok = check_npm_installed(npm_version)
+    if not (node_ok and npm_ok):
         sys.exit(1)
     
-    # Check if dependencies are installed
-    if not check_dependencies() or "--install" in sys.argv:
-        install_dependencies()
+    # Install only when node_modules is missing or package-lock.json changed
+    if args.no_cache or not check_dependencies():
+        install_dependencies(offline=args.offline, force=args.no_cache)
+    elif args.install:
+        print("Dependencies match package-lock.json, skipping install")
     
     # Determine action
-    if "--build" in sys.argv:
-        build_production()
+    if args.build:
+        build_production(force=args.no_cache)
     else:
         run_development_server()
 